@@ -12,7 +12,8 @@ from src.database.models import Base
 # access to the values within the .ini file in use.
 config = context.config
 
-config.set_main_option("sqlalchemy.url", SQLALCHAMY_DATABASE_URL)
+# "%" in a password would otherwise be read as configparser interpolation
+config.set_main_option("sqlalchemy.url", SQLALCHAMY_DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
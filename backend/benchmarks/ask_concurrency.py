@@ -0,0 +1,118 @@
+"""
+Concurrency benchmark for POST /ask against a stubbed LLM.
+
+Retrieval is replaced by a short blocking call (standing in for the
+embedding + Chroma query) and the LLM by the fake backend, so the numbers
+show how many requests the app can keep in flight, not model speed.
+
+Usage (from backend/):
+    python -m benchmarks.ask_concurrency --concurrency 1 16 128
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# The database URL is relative, so run against a throwaway working directory.
+os.chdir(tempfile.mkdtemp(prefix="uet-bench-"))
+
+import httpx  # noqa: E402
+from loguru import logger  # noqa: E402
+
+from src import main as main_module  # noqa: E402
+from src.main import app  # noqa: E402
+from src.database.config import Base, engine  # noqa: E402
+from src.routers import ask_llama_api  # noqa: E402
+from src.services.answer_cache import SemanticAnswerCache  # noqa: E402
+from src.services.llm_service import FakeLLMBackend, LLMService  # noqa: E402
+
+
+class StubVectorStore:
+    version = 0
+
+    def __init__(self, retrieval_ms: float):
+        self.retrieval_s = retrieval_ms / 1000
+
+    def warm_up(self):
+        pass
+
+    def embed_query(self, question: str) -> list[float]:
+        return [1.0, 0.0, 0.0]
+
+    def get_top_chunks(self, question: str, top_k: int = 3, **kwargs) -> list[dict]:
+        time.sleep(self.retrieval_s)
+        return [
+            {"id": f"stub_{i}", "document": f"stub chunk {i}", "score": float(i), "source": "stub"}
+            for i in range(top_k)
+        ]
+
+
+async def run_level(concurrency: int, requests_per_client: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+
+    async def client_loop(client: httpx.AsyncClient, worker: int):
+        for i in range(requests_per_client):
+            start = time.perf_counter()
+            # distinct questions, so the LLM service does not coalesce them
+            question = f"eligibility {worker} {i}"
+            response = await client.post("/ask/", json={"question": question})
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            await asyncio.gather(*(client_loop(client, w) for w in range(concurrency)))
+            elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 128])
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--llm-ms", type=float, default=200)
+    parser.add_argument("--llm-slots", type=int, default=128)
+    parser.add_argument("--retrieval-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    logger.remove()
+    Base.metadata.create_all(engine)
+
+    stub_store = StubVectorStore(args.retrieval_ms)
+    ask_llama_api.get_vector_store = main_module.get_vector_store = lambda: stub_store
+    # generations run in parallel up to --llm-slots
+    LLMService._instance = LLMService(
+        backend=FakeLLMBackend(latency_ms=args.llm_ms, slots=args.llm_slots),
+        slots=args.llm_slots,
+    )
+    # the questions differ, but the stub embeds them all to the same vector,
+    # so the semantic cache would answer them; keep it out of the way
+    SemanticAnswerCache._instance = SemanticAnswerCache(threshold=2.0)
+
+    print(f"{'clients':>8} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'max ms':>9}")
+    for concurrency in args.concurrency:
+        result = asyncio.run(run_level(concurrency, args.requests_per_client))
+        print(
+            f"{result['concurrency']:>8} {result['requests']:>9} "
+            f"{result['rps']:>9.1f} {result['p50_ms']:>9.1f} {result['max_ms']:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
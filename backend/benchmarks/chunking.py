@@ -0,0 +1,138 @@
+"""
+Chunking throughput (MB/s) on a large synthetic prospectus.
+
+Compares the offset-based chunker in src.utils.chuncker with the previous
+split-based one (kept below as a reference) on the same pages, checks that
+both produce the same chunks, and measures token-length chunking with
+overlap on top.
+
+Usage (from backend/):
+    python -m benchmarks.chunking --mb 50 --max-tokens 0 128 256
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import prospectus_text  # noqa: E402
+from src.utils.chuncker import (  # noqa: E402
+    HEADER_CARRY_CHARS,
+    count_tokens,
+    iter_chunk_records,
+)
+
+DEPT_PATTERN = re.compile(
+    r"(\d+\.\s*(?:Department|Institute|Center|Centre)(?:\s+of)? [A-Za-z &]+)",
+    re.IGNORECASE,
+)
+SECTION_PATTERN = re.compile(
+    r"(\d+\.\d+\s+(Introduction|Offered Programs|Eligibility Criteria|Faculty Members))",
+    re.IGNORECASE,
+)
+
+
+def _reference_departments(text: str):
+    dept_splits = DEPT_PATTERN.split(text)
+    for i in range(1, len(dept_splits), 2):
+        department_name = re.sub(r"^\d+\.\s+", "", dept_splits[i].strip())
+        section_splits = SECTION_PATTERN.split(dept_splits[i + 1].strip())
+        for j in range(1, len(section_splits), 3):
+            section_name = section_splits[j + 1].strip()
+            section_content = section_splits[j + 2].strip()
+            if len(section_content) < 50:
+                continue
+            yield {
+                "department": department_name,
+                "section": section_name,
+                "text": f"{department_name} - {section_name}: {section_content}",
+            }
+
+
+def reference_chunk_records(pages):
+    """
+    The chunker before the offset-based rewrite: re-scans and splits
+    (copies) the whole department buffer for every page.
+    """
+    buffer = ""
+    for page in pages:
+        page = re.sub(r"\s+", " ", page).strip()
+        if not page:
+            continue
+        buffer = f"{buffer} {page}" if buffer else page
+        headers = list(DEPT_PATTERN.finditer(buffer))
+        if not headers:
+            buffer = buffer[-HEADER_CARRY_CHARS:]
+            continue
+        last_start = headers[-1].start()
+        if len(headers) > 1:
+            yield from _reference_departments(buffer[:last_start])
+        buffer = buffer[last_start:]
+    if buffer:
+        yield from _reference_departments(buffer)
+
+
+def _pages(text: str, lines_per_page: int) -> list[str]:
+    lines = text.split("\n")
+    return [
+        "\n".join(lines[i : i + lines_per_page])
+        for i in range(0, len(lines), lines_per_page)
+    ]
+
+
+def _best(fn, repeat: int):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = list(fn())
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mb", type=float, default=50, help="size of the synthetic text")
+    parser.add_argument("--lines-per-page", type=int, default=50)
+    parser.add_argument("--max-tokens", type=int, nargs="+", default=[0, 128, 256])
+    parser.add_argument("--overlap-tokens", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    text = prospectus_text(int(args.mb * 1e6))
+    pages = _pages(text, args.lines_per_page)
+    size_mb = len(text.encode("utf-8")) / 1e6
+    print(f"Synthetic prospectus: {size_mb:.1f} MB, {len(pages)} pages")
+
+    reference_s, expected = _best(lambda: reference_chunk_records(pages), args.repeat)
+
+    print(f"{'chunker':<28} {'best s':>8} {'MB/s':>8} {'chunks':>8} {'max tok':>8}")
+
+    def report(name: str, seconds: float, records: list[dict]):
+        longest = max(count_tokens(r["text"]) for r in records)
+        print(
+            f"{name:<28} {seconds:>8.2f} {size_mb / seconds:>8.1f} "
+            f"{len(records):>8} {longest:>8}"
+        )
+
+    report("reference (split)", reference_s, expected)
+    for max_tokens in args.max_tokens:
+        seconds, records = _best(
+            lambda: iter_chunk_records(pages, max_tokens, args.overlap_tokens),
+            args.repeat,
+        )
+        if max_tokens == 0 and records != expected:
+            raise SystemExit("offset-based chunks differ from the reference")
+        name = (
+            f"offsets, {max_tokens}/{args.overlap_tokens} tok"
+            if max_tokens
+            else "offsets, whole sections"
+        )
+        report(name, seconds, records)
+
+
+if __name__ == "__main__":
+    main()
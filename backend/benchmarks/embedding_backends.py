@@ -0,0 +1,134 @@
+"""
+Startup time, query latency and memory of the embedding backends on CPU.
+
+Each backend runs in a fresh interpreter so import and model-load time
+are measured cold. Reported per backend:
+- load s: import + model load (what the lifespan warm-up pays once)
+- first ms: the first encode after loading
+- p50/p95 ms: single-question encodes (the /ask path)
+- chunks/s: batch encodes of prospectus-sized chunks (the ingest path)
+- RSS MB: peak resident memory of the process
+- cos vs torch: mean cosine similarity to the torch vectors
+
+Usage (from backend/):
+    python -m benchmarks.embedding_backends --backends torch onnx onnx-int8
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import prospectus_lines  # noqa: E402
+
+QUESTIONS = [
+    "Which programs does the Department of Electrical Engineering offer?",
+    "What is the eligibility for M.Sc. Data Science?",
+    "Who are the professors in Mechanical Engineering?",
+    "Eligibility criteria for M.Phil. Environmental Sciences?",
+]
+
+
+def _chunks(count: int) -> list[str]:
+    # ~45 lines per department
+    lines = prospectus_lines(departments=count // 3 + 1)
+    return [" ".join(lines[i : i + 12]) for i in range(0, 12 * count, 12)][:count]
+
+
+def measure(backend: str, queries: int, chunks: int, vectors_path: str) -> dict:
+    import numpy as np
+
+    os.environ.setdefault("USE_TF", "0")
+    start = time.perf_counter()
+    from src.vector_store.embedders import load_embedder
+
+    embedder = load_embedder(backend)
+    load_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    embedder.encode(["warm-up"])
+    first_ms = (time.perf_counter() - start) * 1000
+
+    latencies = []
+    for i in range(queries):
+        question = f"{QUESTIONS[i % len(QUESTIONS)]} ({i})"
+        start = time.perf_counter()
+        embedder.encode([question])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    texts = _chunks(chunks)
+    start = time.perf_counter()
+    vectors = np.asarray(embedder.encode(texts), dtype=np.float32)
+    chunks_per_s = len(texts) / (time.perf_counter() - start)
+    np.save(vectors_path, vectors)
+
+    return {
+        "load_s": load_s,
+        "first_ms": first_ms,
+        "p50_ms": latencies[len(latencies) // 2],
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+        "chunks_per_s": chunks_per_s,
+        # ru_maxrss is in KiB on Linux
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--chunks", type=int, default=256)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.queries, args.chunks, args.vectors)))
+        return
+
+    import numpy as np
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results, vectors = {}, {}
+        for backend in args.backends:
+            vectors_path = os.path.join(tmp, f"{backend}.npy")
+            proc = subprocess.run(
+                [
+                    sys.executable, "-m", "benchmarks.embedding_backends",
+                    "--child", backend, "--vectors", vectors_path,
+                    "--queries", str(args.queries), "--chunks", str(args.chunks),
+                ],
+                cwd=BACKEND_DIR,
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                print(f"{backend}: failed\n{proc.stderr.strip().splitlines()[-1]}")
+                continue
+            results[backend] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[backend] = np.load(vectors_path)
+
+    print(
+        f"{'backend':>10} {'load s':>7} {'first ms':>9} {'p50 ms':>7} {'p95 ms':>7} "
+        f"{'chunks/s':>9} {'RSS MB':>7} {'cos vs torch':>13}"
+    )
+    for backend, r in results.items():
+        cos = "-"
+        if "torch" in vectors and backend in vectors:
+            cos = f"{float(np.mean(np.sum(vectors['torch'] * vectors[backend], axis=1))):.4f}"
+        print(
+            f"{backend:>10} {r['load_s']:>7.2f} {r['first_ms']:>9.1f} {r['p50_ms']:>7.2f} "
+            f"{r['p95_ms']:>7.2f} {r['chunks_per_s']:>9.1f} {r['rss_mb']:>7.0f} {cos:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Load test for LLMService against the fake backend (no Ollama needed).
+
+Clients send prompts concurrently; a share of them (--duplicate-ratio)
+repeat a handful of popular prompts, which single-flight coalescing
+answers with one generation. The fake backend takes --latency-ms per
+generation with --slots running at once, like Ollama with
+OLLAMA_NUM_PARALLEL=--slots.
+
+Usage (from backend/):
+    python -m benchmarks.llm_load --concurrency 1 8 32 128 --slots 4
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from src.services.llm_service import (  # noqa: E402
+    FakeLLMBackend,
+    LLMBusyError,
+    LLMService,
+    LLMTimeoutError,
+)
+
+POPULAR_PROMPTS = 4
+
+
+async def run_level(args, concurrency: int) -> dict:
+    backend = FakeLLMBackend(latency_ms=args.latency_ms, slots=args.slots)
+    service = LLMService(backend=backend, slots=args.slots)
+    rng = random.Random(concurrency)
+    latencies, errors = [], 0
+
+    async def client_loop(worker: int):
+        nonlocal errors
+        for i in range(args.requests_per_client):
+            if rng.random() < args.duplicate_ratio:
+                prompt = f"popular question {rng.randrange(POPULAR_PROMPTS)}"
+            else:
+                prompt = f"question {worker} {i}"
+            start = time.perf_counter()
+            try:
+                await service.generate(prompt, system="system prompt")
+            except (LLMBusyError, LLMTimeoutError):
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(w) for w in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await service.aclose()
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "generations": backend.calls,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests-per-client", type=int, default=10)
+    parser.add_argument("--slots", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.3)
+    args = parser.parse_args()
+
+    print(
+        f"{'clients':>8} {'requests':>9} {'generations':>12} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'errors':>7}"
+    )
+    for concurrency in args.concurrency:
+        r = asyncio.run(run_level(args, concurrency))
+        print(
+            f"{r['concurrency']:>8} {r['requests']:>9} {r['generations']:>12} "
+            f"{r['rps']:>9.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['errors']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Serial vs. process-pool text extraction in read_pdf.
+
+Usage (from backend/):
+    python -m benchmarks.pdf_extraction --pages 400 --workers 1 2 4
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from benchmarks.synthetic import write_pdf  # noqa: E402
+from src.utils.pdf_reader import read_pdf  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "synthetic_prospectus.pdf")
+        write_pdf(pdf_path, args.pages)
+        print(f"Generated {args.pages}-page PDF ({os.path.getsize(pdf_path) / 1e6:.1f} MB)")
+
+        baseline_text, baseline_s = None, None
+        print(f"{'workers':>8} {'best s':>9} {'pages/s':>9} {'speedup':>8}")
+        for workers in sorted(set(args.workers)):
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                text = read_pdf(pdf_path, workers=workers)
+                timings.append(time.perf_counter() - start)
+
+            if baseline_text is None:
+                baseline_text, baseline_s = text, min(timings)
+            elif text != baseline_text:
+                raise SystemExit(f"workers={workers} produced different text")
+
+            best = min(timings)
+            print(
+                f"{workers:>8} {best:>9.2f} {args.pages / best:>9.1f} "
+                f"{baseline_s / best:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
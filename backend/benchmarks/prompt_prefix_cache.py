@@ -0,0 +1,171 @@
+"""
+Prefill latency of the old single-message prompt layout vs. the
+system-message-first layout, against a local stand-in for Ollama.
+
+The stand-in serves /api/chat like Ollama with one slot: it keeps the
+token sequence of the previous request and only "prefills" the tokens
+after the longest common prefix, sleeping --ms-per-token for each.
+That is how Ollama's KV-cache reuse behaves for a single parallel slot.
+
+Usage (from backend/):
+    python -m benchmarks.prompt_prefix_cache --requests 40
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import ollama  # noqa: E402
+
+from src.services.prompt_service import SYSTEM_PROMPT, PromptService  # noqa: E402
+from src.vector_store.bm25 import BM25Index  # noqa: E402
+
+CHUNKS_FILE = os.path.join(BACKEND_DIR, "UET lahore Document_chunks.json")
+
+QUESTIONS = [
+    "Which programs does the Department of Electrical Engineering offer?",
+    "What is the eligibility for M.Sc. Data Science?",
+    "Who are the professors in Mechanical Engineering?",
+    "Does the Department of Architecture offer a Ph.D.?",
+    "Eligibility criteria for M.Phil. Environmental Sciences?",
+    "When was the Department of Civil Engineering established?",
+    "What are the admission requirements for Ph.D. Computer Science?",
+    "List the faculty members of Chemical Engineering.",
+]
+
+
+def legacy_prompt(question: str, context_chunks: list[str]) -> str:
+    # PromptService.build before the system message split
+    context = "\n\n".join(context_chunks)
+    return (
+        "You are an expert academic advisor. Answer the question using only the context below.\n\n"
+        f"Context:\n{context}\n\n"
+        f"Question:\n{question}\n\n"
+        "Instructions:\n"
+        "- Give a clear, complete answer in natural language.\n"
+        "- Check eligibility lists carefully if present.\n"
+        "- Reference context sections if helpful.\n"
+        "- Combine info from multiple chunks if needed.\n"
+        "- Must Say 'The information is not provided in the context.' If the question is not related to a department.\n"
+        "- Do NOT output JSON, braces, lists, or code.\n\n"
+        "Answer:"
+    )
+
+
+class PrefixCachingOllama(BaseHTTPRequestHandler):
+    ms_per_token = 0.5
+    cached_tokens: list[str] = []
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    @staticmethod
+    def _tokens(messages: list[dict]) -> list[str]:
+        # Llama 3 chat template, whitespace-tokenized
+        tokens = ["<|begin_of_text|>"]
+        for message in messages:
+            tokens += [f"<|{message['role']}|>"] + message["content"].split() + ["<|eot_id|>"]
+        return tokens + ["<|assistant|>"]
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        tokens = self._tokens(body["messages"])
+
+        cls = type(self)
+        with cls.lock:
+            reused = 0
+            for a, b in zip(tokens, cls.cached_tokens):
+                if a != b:
+                    break
+                reused += 1
+            evaluated = len(tokens) - reused
+            prefill_s = evaluated * cls.ms_per_token / 1000
+            time.sleep(prefill_s)
+            cls.cached_tokens = tokens
+
+        payload = json.dumps(
+            {
+                "model": body["model"],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "message": {"role": "assistant", "content": "ok"},
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": evaluated,
+                "prompt_eval_duration": int(prefill_s * 1e9),
+                "eval_count": 1,
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+async def run_layout(client, layout: str, requests: list[tuple[str, list[str]]]) -> dict:
+    PrefixCachingOllama.cached_tokens = []
+    prefill_ms, evaluated = [], []
+    for question, chunks in requests:
+        if layout == "legacy":
+            messages = [{"role": "user", "content": legacy_prompt(question, chunks)}]
+        else:
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": PromptService.build(question, chunks)},
+            ]
+        response = await client.chat(model="llama3.2", messages=messages)
+        prefill_ms.append(response["prompt_eval_duration"] / 1e6)
+        evaluated.append(response["prompt_eval_count"])
+    return {
+        "mean_ms": statistics.mean(prefill_ms),
+        "p50_ms": statistics.median(prefill_ms),
+        "tokens_evaluated": statistics.mean(evaluated),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--ms-per-token", type=float, default=0.5)
+    args = parser.parse_args()
+
+    with open(CHUNKS_FILE, encoding="utf-8") as f:
+        documents = json.load(f)
+    index = BM25Index()
+    index.upsert([str(i) for i in range(len(documents))], documents, [{}] * len(documents))
+
+    requests = []
+    for i in range(args.requests):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        hits = index.search(question, args.top_k)
+        requests.append((question, [documents[int(id_)] for id_, _ in hits]))
+
+    PrefixCachingOllama.ms_per_token = args.ms_per_token
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PrefixCachingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = ollama.AsyncClient(host=f"http://127.0.0.1:{server.server_port}")
+
+    print(f"{'layout':>8} {'mean ms':>9} {'p50 ms':>9} {'tokens prefilled':>17}")
+    for layout in ["legacy", "system"]:
+        result = asyncio.run(run_layout(client, layout, requests))
+        print(
+            f"{layout:>8} {result['mean_ms']:>9.1f} {result['p50_ms']:>9.1f} "
+            f"{result['tokens_evaluated']:>17.0f}"
+        )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+"""
+Offline retrieval quality and latency evaluation.
+
+Loads "UET lahore Document_chunks.json" into a throwaway vector store
+(--vector-store chroma or numpy) and runs the labelled questions of
+benchmarks/data/retrieval_questions.json (a chunk is relevant when it
+starts with one of the question's "relevant" headings):
+- through get_top_chunks in every retrieval mode:
+  recall@k, hit@k, MRR and embed/retrieve latency;
+- through POST /ask with the fake LLM backend and the answer cache off:
+  p50/p95/p99 of every stage (from the Server-Timing header) and
+  throughput at --concurrency.
+Peak RSS covers the whole run.
+
+--write-baseline saves the results; --baseline compares a run against
+saved results and, with --fail-on-regression, exits with status 1 when
+quality drops or p95 latency grows beyond the tolerances (relative, and
+at least --latency-floor-ms).
+
+Usage (from backend/; runs offline with the hash embedder or a cached model):
+    python -m benchmarks.retrieval_eval --embedding-backend hash \\
+        --baseline benchmarks/baselines/retrieval_eval.hash.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+CHUNKS_FILE = os.path.join(BACKEND_DIR, "UET lahore Document_chunks.json")
+QUESTIONS_FILE = os.path.join(BACKEND_DIR, "benchmarks", "data", "retrieval_questions.json")
+MODES = ["vector", "lexical", "hybrid"]
+K_VALUES = [1, 3, 5]
+PERCENTILES = [50, 95, 99]
+
+
+def percentile(values: list[float], p: float) -> float:
+    # nearest rank
+    ordered = sorted(values)
+    rank = max(1, round(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values_ms: list[float]) -> dict:
+    return {f"p{p}": round(percentile(values_ms, p), 3) for p in PERCENTILES}
+
+
+def load_store(chunks: list[str], rerank: bool):
+    from src.vector_store.factory import get_local_vector_store
+    from src.vector_store.query_encoder import QueryEncoder
+
+    store = get_local_vector_store()
+    # every measured embedding is a real encode, not an LRU hit
+    store.query_encoder = QueryEncoder(store.model.encode, cache_size=0)
+
+    ids = [f"chunk_{i:03d}" for i in range(len(chunks))]
+    metadatas = []
+    for chunk in chunks:
+        heading = chunk.split(":", 1)[0]
+        department, _, section = heading.partition(" - ")
+        metadatas.append(
+            {"source": os.path.basename(CHUNKS_FILE), "department": department, "section": section}
+        )
+    for start in range(0, len(chunks), 64):
+        batch = slice(start, start + 64)
+        store.add(ids[batch], chunks[batch], store.embed(chunks[batch]), metadatas[batch])
+    if rerank:
+        store.reranker.warm_up()
+    return store, dict(zip(ids, chunks))
+
+
+def evaluate_retrieval(store, documents: dict, questions: list[dict], mode: str, rerank: bool) -> dict:
+    top_k = max(K_VALUES)
+    recall = {k: 0.0 for k in K_VALUES}
+    hits = {k: 0 for k in K_VALUES}
+    reciprocal_ranks = 0.0
+    embed_ms, retrieve_ms = [], []
+
+    for item in questions:
+        relevant = {
+            id_ for id_, doc in documents.items()
+            if any(doc.startswith(heading) for heading in item["relevant"])
+        }
+
+        embedding = None
+        if mode != "lexical":
+            started = time.perf_counter()
+            embedding = store.embed_query(item["question"])
+            embed_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        results = store.get_top_chunks(
+            item["question"], top_k=top_k, embedding=embedding, mode=mode, rerank=rerank
+        )
+        retrieve_ms.append((time.perf_counter() - started) * 1000)
+
+        ranked = [c["id"] for c in results]
+        for k in K_VALUES:
+            found = len(relevant.intersection(ranked[:k]))
+            recall[k] += found / len(relevant)
+            hits[k] += found > 0
+        first = next((rank for rank, id_ in enumerate(ranked, 1) if id_ in relevant), None)
+        reciprocal_ranks += 1 / first if first else 0.0
+
+    n = len(questions)
+    result = {f"recall@{k}": round(recall[k] / n, 4) for k in K_VALUES}
+    result.update({f"hit@{k}": round(hits[k] / n, 4) for k in K_VALUES})
+    result["mrr"] = round(reciprocal_ranks / n, 4)
+    result["latency_ms"] = {"retrieve": summarize(retrieve_ms)}
+    if embed_ms:
+        result["latency_ms"]["embed"] = summarize(embed_ms)
+    return result
+
+
+def _parse_server_timing(header: str) -> dict[str, float]:
+    timings = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        if duration:
+            timings[name] = float(duration)
+    return timings
+
+
+async def evaluate_ask(questions: list[dict], args) -> dict:
+    import httpx
+
+    from src.main import app
+
+    stage_ms: dict[str, list[float]] = {}
+    latencies_ms = []
+    pending = [item["question"] for item in questions] * args.ask_repeat
+
+    async def client_loop(client):
+        while pending:
+            question = pending.pop()
+            started = time.perf_counter()
+            response = await client.post(
+                "/ask/",
+                json={
+                    "question": question,
+                    "top_k": args.top_k,
+                    "retrieval_mode": args.ask_mode,
+                    "rerank": args.rerank,
+                },
+            )
+            response.raise_for_status()
+            latencies_ms.append((time.perf_counter() - started) * 1000)
+            for name, ms in _parse_server_timing(response.headers["server-timing"]).items():
+                stage_ms.setdefault(name, []).append(ms)
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://eval") as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client_loop(client) for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+    return {
+        "mode": args.ask_mode,
+        "concurrency": args.concurrency,
+        "requests": len(latencies_ms),
+        "throughput_rps": round(len(latencies_ms) / elapsed, 2),
+        "latency_ms": {
+            "request": summarize(latencies_ms),
+            **{name: summarize(values) for name, values in sorted(stage_ms.items())},
+        },
+    }
+
+
+def compare(
+    results: dict,
+    baseline: dict,
+    quality_tolerance: float,
+    latency_tolerance: float,
+    latency_floor_ms: float,
+) -> list[str]:
+    """
+    Prints current vs. baseline and returns the regressions.
+    """
+    regressions = []
+    print(f"\n{'metric':<42} {'baseline':>10} {'current':>10}")
+
+    def check(name: str, current: float, previous: float, higher_is_better: bool):
+        if higher_is_better:
+            worse = current < previous - quality_tolerance
+        else:
+            # sub-millisecond stages are mostly scheduler noise
+            worse = current > max(previous * (1 + latency_tolerance), previous + latency_floor_ms)
+        flag = "  REGRESSION" if worse else ""
+        print(f"{name:<42} {previous:>10.3f} {current:>10.3f}{flag}")
+        if worse:
+            regressions.append(name)
+
+    for mode, metrics in results["retrieval"].items():
+        previous = baseline.get("retrieval", {}).get(mode)
+        if previous is None:
+            continue
+        for key, value in metrics.items():
+            if key != "latency_ms" and key in previous:
+                check(f"{mode} {key}", value, previous[key], higher_is_better=True)
+        for stage_name, stats in metrics["latency_ms"].items():
+            if stage_name in previous.get("latency_ms", {}):
+                check(
+                    f"{mode} {stage_name} p95 ms",
+                    stats["p95"],
+                    previous["latency_ms"][stage_name]["p95"],
+                    higher_is_better=False,
+                )
+
+    if "ask" in results and "ask" in baseline:
+        for stage_name, stats in results["ask"]["latency_ms"].items():
+            if stage_name in baseline["ask"]["latency_ms"]:
+                check(
+                    f"ask {stage_name} p95 ms",
+                    stats["p95"],
+                    baseline["ask"]["latency_ms"][stage_name]["p95"],
+                    higher_is_better=False,
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--embedding-backend",
+        default=os.getenv("EMBEDDING_BACKEND", "torch"),
+        choices=["torch", "onnx", "onnx-int8", "hash"],
+    )
+    parser.add_argument(
+        "--vector-store",
+        default=os.getenv("VECTOR_STORE_BACKEND", "chroma"),
+        choices=["chroma", "numpy"],
+    )
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--rerank", action="store_true")
+    parser.add_argument("--top-k", type=int, default=3, help="top_k sent to /ask")
+    parser.add_argument("--ask-mode", default="vector", choices=MODES)
+    parser.add_argument("--ask-repeat", type=int, default=3, help="times each question is asked")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--llm-ms", type=float, default=0, help="fake LLM latency")
+    parser.add_argument("--skip-ask", action="store_true")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--write-baseline", help="save the results to this file")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--quality-tolerance", type=float, default=0.01)
+    parser.add_argument("--latency-tolerance", type=float, default=0.5)
+    parser.add_argument("--latency-floor-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    write_path = os.path.abspath(args.write_baseline) if args.write_baseline else None
+
+    # settings are read when the app modules are imported
+    os.environ["EMBEDDING_BACKEND"] = args.embedding_backend
+    os.environ["VECTOR_STORE_BACKEND"] = args.vector_store
+    os.environ["LLM_BACKEND"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_ms)
+    os.environ["OLLAMA_NUM_PARALLEL"] = str(args.concurrency)
+    os.environ["WARM_UP_ON_STARTUP"] = "0"
+    os.environ.pop("VECTOR_STORE_SOCKET", None)
+    # use cached models and tokenizers only; never wait on the network
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+    # Chroma, NumPy store, BM25 and SQLite paths are relative to the working directory
+    os.chdir(tempfile.mkdtemp(prefix="uet-eval-"))
+
+    from loguru import logger
+
+    logger.remove()
+
+    with open(CHUNKS_FILE, encoding="utf-8") as f:
+        chunks = json.load(f)
+    with open(QUESTIONS_FILE, encoding="utf-8") as f:
+        questions = json.load(f)
+
+    started = time.perf_counter()
+    store, documents = load_store(chunks, args.rerank)
+    load_s = time.perf_counter() - started
+
+    results = {
+        "config": {
+            "embedding_backend": args.embedding_backend,
+            "vector_store": args.vector_store,
+            "rerank": args.rerank,
+            "chunks": len(chunks),
+            "questions": len(questions),
+            "machine": f"{platform.machine()} {os.cpu_count()} cpu, Python {platform.python_version()}",
+        },
+        "index_load_s": round(load_s, 3),
+        "retrieval": {
+            mode: evaluate_retrieval(store, documents, questions, mode, args.rerank)
+            for mode in args.modes
+        },
+    }
+
+    if not args.skip_ask:
+        from src.database.config import Base, engine
+        from src.services.answer_cache import SemanticAnswerCache
+        from src.services.prompt_service import TokenCounter
+
+        import src.database.models  # noqa: F401  (registers the tables)
+
+        Base.metadata.create_all(engine)
+        # every question must reach the prompt and LLM stages
+        SemanticAnswerCache._instance = SemanticAnswerCache(threshold=2.0)
+        TokenCounter.load()
+        results["ask"] = asyncio.run(evaluate_ask(questions, args))
+
+    # ru_maxrss is in KiB on Linux
+    results["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    print(f"{'mode':>8} " + " ".join(f"{m:>9}" for m in ["recall@1", "recall@3", "recall@5", "hit@3", "mrr", "p95 ms"]))
+    for mode, r in results["retrieval"].items():
+        print(
+            f"{mode:>8} {r['recall@1']:>9.3f} {r['recall@3']:>9.3f} {r['recall@5']:>9.3f} "
+            f"{r['hit@3']:>9.3f} {r['mrr']:>9.3f} {r['latency_ms']['retrieve']['p95']:>9.2f}"
+        )
+    if "ask" in results:
+        ask = results["ask"]
+        print(f"\n/ask ({ask['mode']}): {ask['requests']} requests, {ask['throughput_rps']} req/s")
+        for name, stats in ask["latency_ms"].items():
+            print(f"{name:>10} " + " ".join(f"{k} {v:>8.2f} ms" for k, v in stats.items()))
+    print(f"\npeak RSS {results['peak_rss_mb']} MB, index load {results['index_load_s']} s")
+
+    if write_path:
+        with open(write_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"Wrote {write_path}")
+
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config", {}).get("embedding_backend") != args.embedding_backend:
+            print("Warning: the baseline used a different embedding backend")
+        if baseline.get("config", {}).get("vector_store", "chroma") != args.vector_store:
+            print("Warning: the baseline used a different vector store")
+        regressions = compare(
+            results,
+            baseline,
+            args.quality_tolerance,
+            args.latency_tolerance,
+            args.latency_floor_ms,
+        )
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
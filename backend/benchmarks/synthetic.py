@@ -0,0 +1,110 @@
+"""
+Synthetic prospectus text and PDFs for the benchmarks.
+
+The PDF writer emits plain PDF 1.4 with the built-in Helvetica font, so no
+PDF library is needed to generate test documents.
+"""
+
+import random
+
+SECTIONS = ["Introduction", "Offered Programs", "Eligibility Criteria", "Faculty Members"]
+
+WORDS = (
+    "the department offers postgraduate programs in engineering with research "
+    "laboratories faculty members professors associate assistant eligibility "
+    "criteria bachelor degree sixteen years education admission test interview "
+    "electrical mechanical civil computer science data architecture chemical"
+).split()
+
+
+def _sentence(rng: random.Random) -> str:
+    words = rng.choices(WORDS, k=rng.randint(8, 20))
+    return " ".join(words).capitalize() + "."
+
+
+def prospectus_lines(departments: int, seed: int = 0) -> list[str]:
+    """
+    Lines of a fake prospectus laid out like the UET one:
+    "N. Department of X" headers with "N.M <Section>" subsections.
+    """
+    rng = random.Random(seed)
+    lines = [f"Front matter line {i}" for i in range(20)]
+    for d in range(1, departments + 1):
+        lines.append(f"{d}. Department of Synthetic Engineering {chr(65 + d % 26)}")
+        for s, section in enumerate(SECTIONS, start=1):
+            lines.append(f"{d}.{s} {section}")
+            for _ in range(rng.randint(6, 14)):
+                lines.append(_sentence(rng))
+    return lines
+
+
+def prospectus_text(target_bytes: int, seed: int = 0) -> str:
+    lines, departments = [], 8
+    while sum(len(line) + 1 for line in lines) < target_bytes:
+        departments *= 2
+        lines = prospectus_lines(departments, seed)
+    return "\n".join(lines)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, pages: int, lines_per_page: int = 50, seed: int = 0):
+    """
+    Writes a `pages`-page PDF of prospectus-like text to `path`.
+    """
+    lines = prospectus_lines(departments=pages, seed=seed)
+    while len(lines) < pages * lines_per_page:
+        lines += lines
+    # wrap long sentences so they fit the page width
+    wrapped = []
+    for line in lines:
+        while len(line) > 90:
+            cut = line.rfind(" ", 0, 90)
+            wrapped.append(line[:cut])
+            line = line[cut + 1 :]
+        wrapped.append(line)
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for p in range(pages):
+        page_lines = wrapped[p * lines_per_page : (p + 1) * lines_per_page]
+        content = "BT /F1 10 Tf 14 TL 40 800 Td " + " ".join(
+            f"({_escape(line)}) Tj T*" for line in page_lines
+        ) + " ET"
+        stream = content.encode("latin-1", "replace")
+        objects.append(
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+        )
+        content_ref = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_ref
+        )
+        page_refs.append(len(objects))
+
+    kids = " ".join(f"{ref} 0 R" for ref in page_refs).encode()
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+
+    with open(path, "wb") as f:
+        f.write(out)
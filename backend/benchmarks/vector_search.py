@@ -0,0 +1,123 @@
+"""
+Vector search latency: ChromaVectorStore (HNSW) vs NumpyVectorStore (exact).
+
+Fills both stores with the same random unit vectors for each collection
+size and times _vector_search for single queries (p50/p95) and for
+batches of queries (queries per second), plus the recall of Chroma's
+approximate top-k against the exact NumPy one. Random vectors are a hard
+case for HNSW, so its recall here is a lower bound.
+
+Usage (from backend/; the hash embedder keeps model loading out of it):
+    python -m benchmarks.vector_search --sizes 100 1000 10000 --top-k 12
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def _percentile(values: list[float], p: float) -> float:
+    return float(np.percentile(values, p))
+
+
+def _fill(store, vectors: np.ndarray, batch_size: int = 1024):
+    ids = [f"chunk_{i:06d}" for i in range(len(vectors))]
+    documents = [f"synthetic chunk {i}" for i in range(len(vectors))]
+    metadatas = [{"source": "synthetic", "department": f"D{i % 20}"} for i in range(len(vectors))]
+    for start in range(0, len(vectors), batch_size):
+        batch = slice(start, start + batch_size)
+        store.upsert(
+            ids[batch], documents[batch], vectors[batch].tolist(), metadatas[batch], save=False
+        )
+    store.save()
+
+
+def _time_store(store, queries: np.ndarray, top_k: int, batch_size: int, filters):
+    single_ms = []
+    results = []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(store._vector_search([query.tolist()], top_k, filters)[0])
+        single_ms.append((time.perf_counter() - started) * 1000)
+
+    batches = [queries[i : i + batch_size].tolist() for i in range(0, len(queries), batch_size)]
+    started = time.perf_counter()
+    for batch in batches:
+        store._vector_search(batch, top_k, filters)
+    batch_qps = len(queries) / (time.perf_counter() - started)
+
+    return {
+        "p50": _percentile(single_ms, 50),
+        "p95": _percentile(single_ms, 95),
+        "single_qps": len(queries) / (sum(single_ms) / 1000),
+        "batch_qps": batch_qps,
+        "ids": [[chunk["id"] for chunk in chunks] for chunks in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=12, help="3 x RERANK_CANDIDATES_PER_K")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--filtered", action="store_true", help="also filter on department")
+    args = parser.parse_args()
+
+    os.environ.setdefault("EMBEDDING_BACKEND", "hash")
+    os.environ.setdefault("HF_HUB_OFFLINE", "1")
+
+    from loguru import logger
+
+    logger.remove()
+
+    from src.vector_store.chroma import ChromaVectorStore
+    from src.vector_store.embedders import EMBEDDING_DIM
+    from src.vector_store.numpy_store import NumpyVectorStore
+
+    # Chroma and BM25 paths are relative to the working directory; Chroma
+    # keeps one client per path, so both stores are reused for every size
+    os.chdir(tempfile.mkdtemp(prefix="uet-vector-search-"))
+    stores = {"chroma": ChromaVectorStore(), "numpy": NumpyVectorStore()}
+
+    rng = np.random.default_rng(0)
+    filters = {"department": "D3"} if args.filtered else None
+
+    print(
+        f"{'chunks':>8} {'store':>6} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'1-q qps':>9} {f'{args.batch_size}-q qps':>9} {'fill s':>7} {'recall':>7}"
+    )
+    for size in args.sizes:
+        vectors = rng.standard_normal((size, EMBEDDING_DIM)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        queries = rng.standard_normal((args.queries, EMBEDDING_DIM)).astype(np.float32)
+
+        timings = {}
+        for name, store in stores.items():
+            if store.count():
+                store.delete(store.get_chunks(0, store.count())["ids"])
+            started = time.perf_counter()
+            _fill(store, vectors)
+            fill_s = time.perf_counter() - started
+            timings[name] = _time_store(store, queries, args.top_k, args.batch_size, filters)
+            timings[name]["fill_s"] = fill_s
+
+        exact = timings["numpy"]["ids"]
+        for name, t in timings.items():
+            found = sum(len(set(ids) & set(truth)) for ids, truth in zip(t["ids"], exact))
+            recall = found / max(1, sum(len(truth) for truth in exact))
+            print(
+                f"{size:>8} {name:>6} {t['p50']:>8.3f} {t['p95']:>8.3f} "
+                f"{t['single_qps']:>9.0f} {t['batch_qps']:>9.0f} {t['fill_s']:>7.2f} {recall:>7.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
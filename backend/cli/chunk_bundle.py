@@ -0,0 +1,54 @@
+import os
+import sys
+import argparse
+import json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.ingest_service import IMPORT_BATCH_SIZE, IngestService
+
+
+# ============================================================
+# Bulk import / export of chunks, without parsing PDFs
+# ============================================================
+# Run from backend/, next to chroma_db/ (or with VECTOR_STORE_SOCKET set):
+#
+#   python cli/chunk_bundle.py export uet_bundle
+#   python cli/chunk_bundle.py import uet_bundle            # on the new node
+#   python cli/chunk_bundle.py import uet_chunks.json       # cli/chunck_text.py output
+#   python cli/chunk_bundle.py import "UET lahore Document_chunks.json"
+#
+# A bundle is a directory with chunks.jsonl, embeddings.npy (float32,
+# memory-mapped on import) and manifest.json; importing it re-embeds
+# nothing as long as the embedding model is the same.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import/export of chunks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import", help="load a JSON array, JSONL file or chunk bundle"
+    )
+    import_parser.add_argument("path")
+    import_parser.add_argument(
+        "--source", help="source name for chunks without one (default: from the file name)"
+    )
+    import_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    export_parser = commands.add_parser(
+        "export", help="write every stored chunk and embedding to a bundle directory"
+    )
+    export_parser.add_argument("path")
+    export_parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        print(f"📥 Importing chunks from {args.path}...")
+        result = IngestService.import_chunks(
+            args.path, source=args.source, batch_size=args.batch_size
+        )
+    else:
+        print(f"📤 Exporting chunks to {args.path}...")
+        result = IngestService.export_chunks(args.path, batch_size=args.batch_size)
+
+    print(json.dumps(result, indent=2))
@@ -1,7 +1,9 @@
 from src.database.models.chat_history import ChatHistory
+from src.database.models.ingest_job import IngestJob
 from src.database.config import Base
 
 __all__ = [
     "Base",
     "ChatHistory",
-]
\ No newline at end of file
+    "IngestJob",
+]
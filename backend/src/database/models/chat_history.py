@@ -1,11 +1,15 @@
 import uuid
 from datetime import datetime, timezone
-from sqlalchemy import Column, Text, DateTime
+from sqlalchemy import Column, Text, DateTime, Index
 from src.database.config import Base
 
 
 class ChatHistory(Base):
     __tablename__ = "chat_history"
+    __table_args__ = (
+        # keyset pagination of GET /history walks this index
+        Index("ix_chat_history_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Text, primary_key=True, default=lambda: str(uuid.uuid4()))
 
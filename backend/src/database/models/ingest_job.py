@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime, timezone
+from sqlalchemy import Column, Text, DateTime, Integer
+from src.database.config import Base
+
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(Text, primary_key=True, default=lambda: str(uuid.uuid4()))
+
+    file_path = Column(Text, nullable=False)
+
+    kind = Column(Text, nullable=False, default="pdf", server_default="pdf")  # pdf/chunks
+
+    status = Column(Text, nullable=False, default="queued")  # queued/running/completed/failed
+
+    owner = Column(Text, nullable=True)  # worker process running the job
+
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # renewed by the owner
+
+    stage = Column(Text, nullable=True)
+
+    total_pages = Column(Integer, nullable=True)
+
+    pages_processed = Column(Integer, nullable=False, default=0)
+
+    chunks_total = Column(Integer, nullable=True)
+
+    chunks_embedded = Column(Integer, nullable=False, default=0)
+
+    stage_timings = Column(Text, nullable=True)  # store JSON as string
+
+    result = Column(Text, nullable=True)  # store JSON as string
+
+    error = Column(Text, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    started_at = Column(DateTime(timezone=True), nullable=True)
+
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,8 +1,51 @@
+import os
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.routers import ingest_api, search_api, ask_llama_api, chat_history_api
+from loguru import logger
+from src.routers import ingest_api, search_api, ask_llama_api, chat_history_api, metrics_api
+from src.services.history_recorder import ChatHistoryRecorder
+from src.services.ingest_jobs import IngestJobQueue
+from src.services.llm_service import LLMService
+from src.services.prompt_service import TokenCounter
+from src.utils.concurrency import run_blocking
+from src.utils.metrics import TimingMiddleware
+from src.vector_store.factory import get_vector_store
+from src.vector_store.reranker import RERANK_ENABLED
+
+
+# Load the embedding model before the worker reports ready
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
+
+async def warm_up():
+    start = time.perf_counter()
+    vector_store = await run_blocking(get_vector_store)
+    await run_blocking(vector_store.warm_up)
+    # from the local cache only; a missing tokenizer downloads in the background
+    await run_blocking(TokenCounter.load)
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if WARM_UP_ON_STARTUP:
+        await warm_up()
+    elif RERANK_ENABLED:
+        # requests re-rank by default, so load the cross-encoder regardless
+        vector_store = await run_blocking(get_vector_store)
+        await run_blocking(vector_store.warm_up_reranker)
+    await ChatHistoryRecorder.get_instance().start()
+    IngestJobQueue.get_instance().start()
+    yield
+    IngestJobQueue.get_instance().shutdown()
+    await ChatHistoryRecorder.get_instance().stop()
+    await LLMService.get_instance().aclose()
+
 
-app = FastAPI(title="RAG Backend")
+app = FastAPI(title="RAG Backend", lifespan=lifespan)
 
 
 # Configure CORS
@@ -12,10 +55,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # let the frontend read the per-stage breakdown
+    expose_headers=["Server-Timing"],
 )
+app.add_middleware(TimingMiddleware)
 
 
 app.include_router(ingest_api.router, prefix="/ingest", tags=["Ingestion"])
 app.include_router(search_api.router, prefix="/search", tags=["Search"])
 app.include_router(ask_llama_api.router, prefix="/ask", tags=["Ask Ollama"])
 app.include_router(chat_history_api.router, prefix="/history", tags=["Chat History"])
+app.include_router(metrics_api.router, tags=["Metrics"])
@@ -1,21 +1,106 @@
-from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer
 
 from src.schemas.chat_history import ChatHistoryCreate
 from src.database.models import ChatHistory
 
 
-def get_all_chat_history(db: Session) -> list[ChatHistory]:
-    return db.query(ChatHistory).order_by(ChatHistory.created_at.desc()).all()
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; they are stored in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def encode_history_cursor(record: ChatHistory) -> str:
+    payload = json.dumps([_as_utc(record.created_at).isoformat(), record.id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_history_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Raises ValueError for a malformed cursor.
+    """
+    try:
+        created_at, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return _as_utc(datetime.fromisoformat(created_at)), str(id_)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
 
+async def get_chat_history_page(
+    db: AsyncSession,
+    limit: int = 20,
+    cursor: Optional[tuple[datetime, str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_sources: bool = True,
+) -> tuple[list[ChatHistory], Optional[str]]:
+    """
+    Returns one page of history (latest first) and the cursor of the next
+    page, or None on the last page. Pages are keyed on (created_at, id), so
+    each one is an index range scan regardless of table size.
+    """
+    query = select(ChatHistory)
 
-def create_chat_history(request: ChatHistoryCreate, db: Session):
+    if not include_sources:
+        query = query.options(defer(ChatHistory.source_chunks))
+    if start is not None:
+        query = query.where(ChatHistory.created_at >= _as_utc(start))
+    if end is not None:
+        query = query.where(ChatHistory.created_at < _as_utc(end))
+    if cursor is not None:
+        created_at, id_ = cursor
+        query = query.where(
+            or_(
+                ChatHistory.created_at < created_at,
+                and_(ChatHistory.created_at == created_at, ChatHistory.id < id_),
+            )
+        )
+
+    query = query.order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc())
+    result = await db.execute(query.limit(limit + 1))
+    records = list(result.scalars().all())
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        next_cursor = encode_history_cursor(records[-1])
+    return records, next_cursor
+
+
+async def create_chat_history(request: ChatHistoryCreate, db: AsyncSession):
     history = ChatHistory(
         question=request.question,
         answer=request.answer,
         source_chunks=request.source_chunks,
     )
     db.add(history)
-    db.commit()
-    db.refresh(history)
+    await db.commit()
+    await db.refresh(history)
     return history
+
+
+async def create_chat_history_batch(
+    requests: list[ChatHistoryCreate], db: AsyncSession
+) -> list[ChatHistory]:
+    """
+    Inserts several history rows in a single transaction.
+    """
+    records = [
+        ChatHistory(
+            question=request.question,
+            answer=request.answer,
+            source_chunks=request.source_chunks,
+        )
+        for request in requests
+    ]
+    db.add_all(records)
+    await db.commit()
+    return records
@@ -0,0 +1,108 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import Session
+
+from src.database.models import IngestJob
+
+
+def create_ingest_job(file_path: str, db: Session, kind: str = "pdf") -> IngestJob:
+    job = IngestJob(file_path=file_path, kind=kind, status="queued")
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_ingest_job(job_id: str, db: Session) -> IngestJob | None:
+    return db.get(IngestJob, job_id)
+
+
+def get_queued_ingest_job_ids(db: Session, limit: int) -> list[str]:
+    return list(
+        db.scalars(
+            select(IngestJob.id)
+            .where(IngestJob.status == "queued")
+            .order_by(IngestJob.created_at)
+            .limit(limit)
+        )
+    )
+
+
+def claim_ingest_job(
+    job_id: str, owner: str, db: Session, max_running: int
+) -> IngestJob | None:
+    """
+    Moves a queued job to running under `owner` in one UPDATE, so of the
+    workers claiming the same job exactly one gets it. Returns None when
+    the job is no longer queued or max_running jobs already run (exact on
+    SQLite, which serializes writers; best effort on server databases).
+    """
+    now = datetime.now(timezone.utc)
+    running = (
+        select(func.count())
+        .select_from(IngestJob)
+        .where(IngestJob.status == "running")
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id == job_id, IngestJob.status == "queued", running < max_running)
+        .values(status="running", owner=owner, heartbeat_at=now, started_at=now, error=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    if result.rowcount != 1:
+        return None
+    return db.get(IngestJob, job_id, populate_existing=True)
+
+
+def heartbeat_ingest_jobs(job_ids: list[str], owner: str, db: Session) -> int:
+    """
+    Renews the lease on the given running jobs of `owner`; returns how
+    many it still holds.
+    """
+    result = db.execute(
+        update(IngestJob)
+        .where(
+            IngestJob.id.in_(job_ids),
+            IngestJob.owner == owner,
+            IngestJob.status == "running",
+        )
+        .values(heartbeat_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def requeue_stale_ingest_jobs(db: Session, stale_before: datetime) -> int:
+    """
+    Queues again the running jobs whose owner stopped heartbeating before
+    `stale_before` (its process died). Returns how many this call requeued.
+    """
+    stale = or_(IngestJob.heartbeat_at.is_(None), IngestJob.heartbeat_at < stale_before)
+    job_ids = list(
+        db.scalars(select(IngestJob.id).where(IngestJob.status == "running", stale))
+    )
+    if not job_ids:
+        # idle workers poll with reads only
+        return 0
+    result = db.execute(
+        update(IngestJob)
+        .where(IngestJob.id.in_(job_ids), IngestJob.status == "running", stale)
+        .values(status="queued", owner=None, heartbeat_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def update_ingest_job(job_id: str, db: Session, **fields) -> IngestJob | None:
+    job = db.get(IngestJob, job_id)
+    if job is None:
+        return None
+    for name, value in fields.items():
+        setattr(job, name, value)
+    db.commit()
+    return job
@@ -1,52 +1,111 @@
+import asyncio
 import json
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
+import os
+import time
+import anyio
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
-from src.vector_store.chroma import ChromaVectorStore
+from src.vector_store.factory import get_vector_store
 from src.services.prompt_service import PromptService
-from src.services.llm_service import LLMService
-from src.schemas.rag import RAGResponse
-from src.repository.chat_history import create_chat_history
+from src.database.config import AsyncSessionLocal
+from src.repository.chat_history import create_chat_history_batch
+from src.services.llm_service import (
+    OLLAMA_NUM_PARALLEL,
+    LLMBusyError,
+    LLMService,
+    LLMTimeoutError,
+)
+from src.services.answer_cache import SemanticAnswerCache
+from src.services.history_recorder import ChatHistoryRecorder
+from src.schemas.rag import BatchRAGResponse, RAGResponse
+from src.schemas.request import BatchQueryRequest, QueryRequest
 from src.schemas.chat_history import ChatHistoryCreate
-from src.database.config import get_db
+from src.utils.concurrency import run_blocking
+from src.utils.metrics import HISTORY_ROWS_DROPPED, observe_stage, stage
 
 router = APIRouter()
 
+# Generations one POST /ask/batch runs at once; beyond Ollama's parallel
+# slots they would only queue inside LLMService and risk its queue timeout
+ASK_BATCH_CONCURRENCY = int(os.getenv("ASK_BATCH_CONCURRENCY", str(OLLAMA_NUM_PARALLEL)))
 
-class QueryRequest(BaseModel):
-    question: str
-    top_k: int = 3
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _retrieve(request: QueryRequest):
+    """
+    Embeds the question once and retrieves its top chunks.
+    Returns (vector_store, question_embedding, results).
+    """
+    vector_store = await run_blocking(get_vector_store)
+    logger.info("Vector store instance retrieved")
+
+    with stage("embed"):
+        embedding = await run_blocking(vector_store.embed_query, request.question)
+    with stage("retrieve"):
+        results = await run_blocking(
+            vector_store.get_top_chunks,
+            question=request.question,
+            top_k=request.top_k,
+            embedding=embedding,
+            mode=request.retrieval_mode,
+            filters=request.filters,
+            rerank=request.rerank,
+        )
+    return vector_store, embedding, results
 
 
 @router.post("/", response_model=RAGResponse)
-def ask_llama_rag(
-    request: QueryRequest,
-    db: Session = Depends(get_db),
-):
+async def ask_llama_rag(request: QueryRequest):
     logger.info(f"Received question: {request.question}")
 
-    # --- Vector store (singleton) ---
-    vector_store = ChromaVectorStore.get_instance()
-    logger.info("ChromaVectorStore instance retrieved")
-
     # --- Retrieve ---
-    results = vector_store.get_top_chunks(
-        question=request.question,
-        top_k=request.top_k,
-    )
+    vector_store, embedding, results = await _retrieve(request)
 
     text_chuncks = [c["document"] for c in results]
+    chunk_ids = [c["id"] for c in results]
+
+    # --- Answer cache ---
+    cache = SemanticAnswerCache.get_instance()
+    with stage("cache"):
+        cached = cache.lookup(embedding, chunk_ids, vector_store.version)
 
-    # --- Prompt ---
-    prompt = PromptService.build(request.question, text_chuncks)
-    logger.info("RAG prompt built")
+    usage = None
+    if cached is not None:
+        answer = cached.answer
+    else:
+        # --- Prompt ---
+        with stage("prompt"):
+            built = await run_blocking(
+                PromptService.build_budgeted, request.question, text_chuncks
+            )
+        usage = built.usage
+        logger.info("RAG prompt built")
 
-    # --- LLM ---
-    llm = LLMService()
-    answer = llm.generate(prompt)
-    logger.info("LLM generated answer")
+        # --- LLM ---
+        try:
+            with stage("llm"):
+                answer = await LLMService.get_instance().generate(
+                    built.prompt, system=built.system
+                )
+        except LLMBusyError as e:
+            raise HTTPException(503, str(e))
+        except LLMTimeoutError as e:
+            raise HTTPException(504, str(e))
+        logger.info("LLM generated answer")
+
+        cache.store(
+            request.question,
+            embedding,
+            chunk_ids,
+            answer,
+            text_chuncks,
+            vector_store.version,
+        )
 
     # --- Store history ---
     history_data = ChatHistoryCreate(
@@ -54,8 +113,10 @@ def ask_llama_rag(
         answer=answer,
         source_chunks=json.dumps(text_chuncks),
     )
-    create_chat_history(history_data, db)
-    logger.info("Chat history stored in DB")
+    # the write itself is timed as db_write by the recorder
+    with stage("history_enqueue"):
+        await ChatHistoryRecorder.get_instance().record(history_data)
+    logger.info("Chat history queued for storage")
 
     # --- Response ---
     return RAGResponse(
@@ -63,4 +124,215 @@ def ask_llama_rag(
         question=request.question,
         answer=answer,
         sources=text_chuncks,
+        cached=cached is not None,
+        usage=usage,
     )
+
+
+@router.post("/stream")
+async def ask_llama_rag_stream(request: QueryRequest):
+    """
+    Same as POST /ask, but answers as Server-Sent Events:
+    a `sources` event first, then `token` events as Ollama generates,
+    and a final `done` event once the answer is complete.
+    """
+    logger.info(f"Received streaming question: {request.question}")
+
+    vector_store, embedding, results = await _retrieve(request)
+    text_chuncks = [c["document"] for c in results]
+    chunk_ids = [c["id"] for c in results]
+
+    cache = SemanticAnswerCache.get_instance()
+    with stage("cache"):
+        cached = cache.lookup(embedding, chunk_ids, vector_store.version)
+
+    built = None
+    if cached is None:
+        with stage("prompt"):
+            built = await run_blocking(
+                PromptService.build_budgeted, request.question, text_chuncks
+            )
+        logger.info("RAG prompt built")
+
+    async def event_stream():
+        yield _sse_event(
+            "sources",
+            {
+                "question": request.question,
+                "sources": text_chuncks,
+                "usage": built.usage if built else None,
+            },
+        )
+
+        if cached is not None:
+            answer = cached.answer
+            yield _sse_event("token", {"token": answer})
+        else:
+            tokens = []
+            started = time.perf_counter()
+            try:
+                llm = LLMService.get_instance()
+                async for token in llm.stream(built.prompt, system=built.system):
+                    if not tokens:
+                        observe_stage("llm_ttft", time.perf_counter() - started)
+                    tokens.append(token)
+                    yield _sse_event("token", {"token": token})
+            except Exception as e:
+                logger.error(f"LLM streaming failed: {e}")
+                yield _sse_event("error", {"detail": "LLM generation failed"})
+                return
+            observe_stage("llm", time.perf_counter() - started)
+
+            answer = "".join(tokens)
+            logger.info("LLM streamed answer")
+            cache.store(
+                request.question,
+                embedding,
+                chunk_ids,
+                answer,
+                text_chuncks,
+                vector_store.version,
+            )
+
+        history_data = ChatHistoryCreate(
+            question=request.question,
+            answer=answer,
+            source_chunks=json.dumps(text_chuncks),
+        )
+        with stage("history_enqueue"):
+            await ChatHistoryRecorder.get_instance().record(history_data)
+        logger.info("Chat history queued for storage")
+
+        yield _sse_event(
+            "done", {"success": True, "answer": answer, "cached": cached is not None}
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/batch")
+async def ask_llama_rag_batch(request: BatchQueryRequest):
+    """
+    Answers many questions in one request, streamed back as NDJSON: one
+    BatchRAGResponse line per question as soon as it is answered (`index`
+    is its position in `questions`), then a final
+    {"done": true, "answered": ..., "failed": ...} line.
+
+    All questions are embedded in one encoder pass and retrieved with one
+    multi-query Chroma call; at most ASK_BATCH_CONCURRENCY answers are
+    generated at once, and the history rows are written in one
+    transaction at the end.
+    """
+    questions = request.questions
+    logger.info(f"Received batch of {len(questions)} questions")
+
+    vector_store = await run_blocking(get_vector_store)
+    with stage("embed"):
+        embeddings = await run_blocking(vector_store.embed, questions)
+    with stage("retrieve"):
+        results = await run_blocking(
+            vector_store.get_top_chunks_batch,
+            questions=questions,
+            top_k=request.top_k,
+            embeddings=embeddings,
+            mode=request.retrieval_mode,
+            filters=request.filters,
+            rerank=request.rerank,
+        )
+    store_version = vector_store.version
+
+    cache = SemanticAnswerCache.get_instance()
+    llm = LLMService.get_instance()
+    generation_slots = asyncio.Semaphore(ASK_BATCH_CONCURRENCY)
+
+    async def answer(index: int) -> BatchRAGResponse:
+        """
+        Never raises: a failure anywhere in the question's work becomes its
+        error line, so the stream always reaches the done line.
+        """
+        question = questions[index]
+        response = {"index": index, "question": question, "sources": []}
+        usage = None
+        try:
+            text_chuncks = [c["document"] for c in results[index]]
+            chunk_ids = [c["id"] for c in results[index]]
+            response["sources"] = text_chuncks
+
+            cached = cache.lookup(embeddings[index], chunk_ids, store_version)
+            if cached is not None:
+                return BatchRAGResponse(success=True, answer=cached.answer, cached=True, **response)
+
+            built = await run_blocking(PromptService.build_budgeted, question, text_chuncks)
+            usage = built.usage
+            async with generation_slots:
+                generated = await llm.generate(built.prompt, system=built.system)
+
+            cache.store(
+                question, embeddings[index], chunk_ids, generated, text_chuncks, store_version
+            )
+        except Exception as e:
+            logger.error(f"Batch question {index} failed: {e}")
+            return BatchRAGResponse(success=False, answer="", usage=usage, error=str(e), **response)
+        return BatchRAGResponse(success=True, answer=generated, usage=usage, **response)
+
+    async def write_history(history: list[ChatHistoryCreate]):
+        try:
+            with stage("db_write"):
+                async with AsyncSessionLocal() as db:
+                    await create_chat_history_batch(history, db)
+        except Exception as e:
+            logger.error(f"Failed to store {len(history)} batch chat history rows: {e}")
+            HISTORY_ROWS_DROPPED.inc(len(history))
+
+    async def ndjson_lines():
+        tasks = [asyncio.create_task(answer(i)) for i in range(len(questions))]
+        history = []
+        try:
+            for next_answer in asyncio.as_completed(tasks):
+                result = await next_answer
+                if result.success:
+                    history.append(
+                        ChatHistoryCreate(
+                            question=result.question,
+                            answer=result.answer,
+                            source_chunks=json.dumps(result.sources),
+                        )
+                    )
+                yield result.model_dump_json() + "\n"
+        finally:
+            # the client went away: stop generating for it, but keep what
+            # was already answered
+            for task in tasks:
+                task.cancel()
+            if history:
+                # Starlette cancels this generator's scope on a disconnect
+                # (ASGI < 2.4), which would cancel the write with it
+                with anyio.CancelScope(shield=True):
+                    await write_history(history)
+
+        logger.info(f"Batch answered {len(history)} of {len(questions)} questions")
+        yield json.dumps(
+            {"done": True, "answered": len(history), "failed": len(questions) - len(history)}
+        ) + "\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/llm")
+async def llm_stats():
+    """
+    Slot usage and coalescing counters of the LLM service
+    """
+    return LLMService.get_instance().stats()
+
+
+@router.get("/cache")
+async def answer_cache_stats():
+    """
+    Hit/miss counters of the semantic answer cache, for tuning its threshold
+    """
+    return SemanticAnswerCache.get_instance().stats()
@@ -1,20 +1,43 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from src.database.config import get_db
-from src.repository.chat_history import get_all_chat_history
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.config import get_async_db
+from src.repository.chat_history import decode_history_cursor, get_chat_history_page
 from src.schemas.chat_history import ChatHistoryResponse, ChatHistoryWrapperResponse
 
 router = APIRouter()
 
 
 @router.get("/")
-def get_chat_history(db: Session = Depends(get_db)):
+async def get_chat_history(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    start: Optional[datetime] = Query(None, description="Only entries created at or after"),
+    end: Optional[datetime] = Query(None, description="Only entries created before"),
+    include_sources: bool = Query(True, description="Include source_chunks"),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get all chat history (latest first)
+    Get chat history (latest first), one page at a time
     """
-    records = get_all_chat_history(db)
+    try:
+        position = decode_history_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    records, next_cursor = await get_chat_history_page(
+        db,
+        limit=limit,
+        cursor=position,
+        start=start,
+        end=end,
+        include_sources=include_sources,
+    )
 
     return ChatHistoryWrapperResponse(
         success=True,
-        history=[ChatHistoryResponse.from_orm(r) for r in records],
+        history=[ChatHistoryResponse.from_orm(r, include_sources) for r in records],
+        next_cursor=next_cursor,
     )
@@ -1,69 +1,61 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 import os
-import json
+from sqlalchemy.orm import Session
 from loguru import logger
 
-from src.schemas.request import IngestRequest
-from src.utils.chuncker import chunk_text
-from src.utils.pdf_reader import read_pdf
-from src.vector_store.chroma import ChromaVectorStore
+from src.database.config import get_db
+from src.repository.ingest_job import get_ingest_job
+from src.schemas.request import ChunkImportRequest, IngestRequest
+from src.schemas.ingest_job import IngestJobCreatedResponse, IngestJobResponse
+from src.services.ingest_jobs import IngestJobQueue
 
 router = APIRouter()
 
 
-def save_chunks_to_file(chunks: list[str], file_path: str):
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(chunks, f, ensure_ascii=False, indent=2)
-    logger.info(f"Chunks saved to file: {file_path}")
-
-
-@router.post("/pdf")
+@router.post("/pdf", status_code=202, response_model=IngestJobCreatedResponse)
 def ingest_pdf(request: IngestRequest):
-    logger.info(f"Starting PDF ingestion: {request.file_path}")
+    """
+    Queues a PDF for ingestion; poll GET /ingest/jobs/{job_id} for progress.
+    """
+    logger.info(f"Received PDF ingestion request: {request.file_path}")
 
     if not os.path.exists(request.file_path):
         logger.error("File not found")
         raise HTTPException(404, "File not found")
 
-    text = read_pdf(request.file_path)
-    logger.info("PDF read successfully")
-
-    if not text.strip():
-        logger.error("No text extracted from PDF")
-        raise HTTPException(400, "No text extracted")
-
-    chunks = chunk_text(text)
-    logger.info(f"Text chunked into {len(chunks)} chunks")
+    job = IngestJobQueue.get_instance().submit(request.file_path)
 
-    if not chunks:
-        logger.error("No chunks created")
-        raise HTTPException(400, "No chunks created")
+    return IngestJobCreatedResponse(
+        message="PDF ingestion queued",
+        job_id=job.id,
+        status=job.status,
+    )
 
-    store = ChromaVectorStore.get_instance()
-    logger.info("ChromaVectorStore instance retrieved")
 
-    embeddings = store.embed(chunks)
-    logger.info("Embeddings created")
+@router.post("/chunks", status_code=202, response_model=IngestJobCreatedResponse)
+def import_chunks(request: ChunkImportRequest):
+    """
+    Queues a bulk load of pre-chunked text (JSON, JSONL or a chunk bundle
+    with embeddings); no PDF parsing, and bundled embeddings are reused.
+    """
+    logger.info(f"Received chunk import request: {request.file_path}")
 
-    start_index = store.collection.count()
-    ids = [
-        f"{os.path.basename(request.file_path)}_{i}"
-        for i in range(start_index, start_index + len(chunks))
-    ]
-    metadatas = [{"source": os.path.basename(request.file_path)} for _ in chunks]
+    if not os.path.exists(request.file_path):
+        logger.error("File not found")
+        raise HTTPException(404, "File not found")
 
-    store.add(ids=ids, documents=chunks, embeddings=embeddings, metadatas=metadatas)
-    logger.info("Chunks added to ChromaDB")
+    job = IngestJobQueue.get_instance().submit(request.file_path, kind="chunks")
 
-    output_file = (
-        os.path.splitext(os.path.basename(request.file_path))[0] + "_chunks.json"
+    return IngestJobCreatedResponse(
+        message="Chunk import queued",
+        job_id=job.id,
+        status=job.status,
     )
-    save_chunks_to_file(chunks, output_file)
 
-    logger.info("PDF ingestion completed")
 
-    return {
-        "message": "PDF ingested successfully",
-        "chunks_created": len(chunks),
-        "saved_file": output_file,
-    }
+@router.get("/jobs/{job_id}", response_model=IngestJobResponse)
+def get_ingest_job_status(job_id: str, db: Session = Depends(get_db)):
+    job = get_ingest_job(job_id, db)
+    if job is None:
+        raise HTTPException(404, "Ingestion job not found")
+    return IngestJobResponse.from_orm(job)
@@ -1,24 +1,50 @@
 from fastapi import APIRouter
 from loguru import logger
 from src.schemas.request import QueryRequest
-from src.vector_store.chroma import ChromaVectorStore
+from src.vector_store.factory import get_vector_store
+from src.utils.concurrency import run_blocking
+from src.utils.metrics import stage
 
 router = APIRouter()
 
 
 @router.post("/")
-def search(request: QueryRequest):
+async def search(request: QueryRequest):
     logger.info(f"Received search query: {request.question}")
 
-    store = ChromaVectorStore.get_instance()
-    logger.info("ChromaVectorStore instance retrieved")
+    store = await run_blocking(get_vector_store)
+    logger.info("Vector store instance retrieved")
 
-    results = store.get_top_chunks(
-        question=request.question,
-        top_k=request.top_k,
-    )
+    with stage("retrieve"):
+        results = await run_blocking(
+            store.get_top_chunks,
+            question=request.question,
+            top_k=request.top_k,
+            mode=request.retrieval_mode,
+            filters=request.filters,
+            rerank=request.rerank,
+        )
 
     return {
         "query": request.question,
         "results": results,
     }
+
+
+@router.get("/departments")
+async def list_departments():
+    """
+    Department names accepted by the `department` filter
+    """
+    store = await run_blocking(get_vector_store)
+    return {"departments": await run_blocking(store.list_departments)}
+
+
+@router.get("/rerank")
+async def rerank_stats():
+    """
+    Cross-encoder re-ranking counters: fallbacks show how often the
+    time budget was exceeded
+    """
+    store = await run_blocking(get_vector_store)
+    return await run_blocking(store.rerank_stats)
@@ -19,12 +19,14 @@ class ChatHistoryResponse(BaseModel):
     created_at: datetime
 
     @classmethod
-    def from_orm(cls, obj):
+    def from_orm(cls, obj, include_sources: bool = True):
+        # with include_sources=False the column is deferred and must not be touched
+        source_chunks = obj.source_chunks if include_sources else None
         return cls(
             id=obj.id,
             question=obj.question,
             answer=obj.answer,
-            source_chunks=json.loads(obj.source_chunks) if obj.source_chunks else None,
+            source_chunks=json.loads(source_chunks) if source_chunks else None,
             created_at=obj.created_at,
         )
 
@@ -33,4 +35,5 @@ class ChatHistoryResponse(BaseModel):
 
 class ChatHistoryWrapperResponse(BaseModel):
     success: bool
-    history: List[ChatHistoryResponse]
\ No newline at end of file
+    history: List[ChatHistoryResponse]
+    next_cursor: Optional[str] = None
\ No newline at end of file
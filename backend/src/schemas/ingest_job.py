@@ -0,0 +1,51 @@
+import json
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+
+class IngestJobResponse(BaseModel):
+    id: str
+    file_path: str
+    kind: str
+    status: str
+    stage: Optional[str]
+    total_pages: Optional[int]
+    pages_processed: int
+    chunks_total: Optional[int]
+    chunks_embedded: int
+    stage_timings: Dict[str, float]
+    result: Optional[Dict[str, Any]]
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    @classmethod
+    def from_orm(cls, obj):
+        return cls(
+            id=obj.id,
+            file_path=obj.file_path,
+            kind=obj.kind,
+            status=obj.status,
+            stage=obj.stage,
+            total_pages=obj.total_pages,
+            pages_processed=obj.pages_processed,
+            chunks_total=obj.chunks_total,
+            chunks_embedded=obj.chunks_embedded,
+            stage_timings=json.loads(obj.stage_timings) if obj.stage_timings else {},
+            result=json.loads(obj.result) if obj.result else None,
+            error=obj.error,
+            created_at=obj.created_at,
+            started_at=obj.started_at,
+            finished_at=obj.finished_at,
+        )
+
+    class Config:
+        from_attributes = True
+
+
+class IngestJobCreatedResponse(BaseModel):
+    message: str
+    job_id: str
+    status: str
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -6,3 +8,12 @@ class RAGResponse(BaseModel):
     question: str
     answer: str
     sources: list[str]
+    cached: bool = False
+    # prompt token counts, absent when the answer came from the cache
+    usage: Optional[dict] = None
+
+
+class BatchRAGResponse(RAGResponse):
+    # position of the question in the request; lines arrive as answers finish
+    index: int
+    error: Optional[str] = None
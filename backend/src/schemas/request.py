@@ -1,9 +1,41 @@
-from pydantic import BaseModel
+import os
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field
+
+# Most questions accepted by one POST /ask/batch
+ASK_BATCH_MAX_QUESTIONS = int(os.getenv("ASK_BATCH_MAX_QUESTIONS", "1000"))
+
 
 class IngestRequest(BaseModel):
     file_path: str = "docs/UET lahore Document.pdf"
 
 
-class QueryRequest(BaseModel):
-    question: str
+class ChunkImportRequest(BaseModel):
+    # JSON array, JSONL file or chunk bundle directory
+    file_path: str = "UET lahore Document_chunks.json"
+
+
+class RetrievalOptions(BaseModel):
     top_k: int = 3
+    # "vector" (MiniLM similarity), "lexical" (BM25) or "hybrid" (both, fused)
+    retrieval_mode: Literal["vector", "hybrid", "lexical"] = "vector"
+    # Restrict retrieval to one department and/or section, e.g.
+    # "Department of Electrical Engineering", "Eligibility Criteria"
+    department: Optional[str] = None
+    section: Optional[str] = None
+    # Re-rank a wider candidate set with a cross-encoder; None uses RERANK_ENABLED
+    rerank: Optional[bool] = None
+
+    @property
+    def filters(self) -> dict:
+        return {"department": self.department, "section": self.section}
+
+
+class QueryRequest(RetrievalOptions):
+    question: str
+
+
+class BatchQueryRequest(RetrievalOptions):
+    # the same retrieval options apply to every question
+    questions: list[str] = Field(min_length=1, max_length=ASK_BATCH_MAX_QUESTIONS)
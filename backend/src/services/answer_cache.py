@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "512"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    sources: list[str]
+    chunk_ids: tuple[str, ...]
+    embedding: np.ndarray
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    LRU/TTL cache of generated answers, keyed by question embedding plus
+    the IDs of the chunks retrieved for it.
+
+    A lookup hits when an entry was built from the same chunks and its
+    question embedding has cosine similarity >= threshold. Entries are
+    dropped whenever the vector store version changes.
+    """
+
+    _instance: Optional["SemanticAnswerCache"] = None
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: OrderedDict[int, CachedAnswer] = OrderedDict()
+        self._next_key = 0
+        self._store_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_version(self, store_version: int):
+        if self._store_version != store_version:
+            if self._entries:
+                logger.info("Vector store changed, clearing answer cache")
+            self._entries.clear()
+            self._store_version = store_version
+
+    def lookup(
+        self, embedding, chunk_ids: list[str], store_version: int
+    ) -> Optional[CachedAnswer]:
+        query = self._normalize(embedding)
+        key_ids = tuple(chunk_ids)
+        now = time.monotonic()
+
+        with self._lock:
+            self._sync_version(store_version)
+
+            best_key, best_similarity = None, self.threshold
+            for key, entry in list(self._entries.items()):
+                if now - entry.created_at > self.ttl_seconds:
+                    del self._entries[key]
+                    continue
+                if entry.chunk_ids != key_ids:
+                    continue
+                similarity = float(np.dot(query, entry.embedding))
+                if similarity >= best_similarity:
+                    best_key, best_similarity = key, similarity
+
+            if best_key is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            logger.info(f"Answer cache hit (similarity={best_similarity:.3f})")
+            return self._entries[best_key]
+
+    def store(
+        self,
+        question: str,
+        embedding,
+        chunk_ids: list[str],
+        answer: str,
+        sources: list[str],
+        store_version: int,
+    ):
+        entry = CachedAnswer(
+            question=question,
+            answer=answer,
+            sources=sources,
+            chunk_ids=tuple(chunk_ids),
+            embedding=self._normalize(embedding),
+            created_at=time.monotonic(),
+        )
+        with self._lock:
+            self._sync_version(store_version)
+            self._entries[self._next_key] = entry
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "threshold": self.threshold,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
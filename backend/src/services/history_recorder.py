@@ -0,0 +1,144 @@
+import asyncio
+import os
+from typing import Optional
+
+from loguru import logger
+
+from src.database.config import AsyncSessionLocal
+from src.repository.chat_history import create_chat_history_batch
+from src.schemas.chat_history import ChatHistoryCreate
+from src.utils.metrics import HISTORY_QUEUE_DEPTH, HISTORY_ROWS_DROPPED, stage
+
+
+HISTORY_QUEUE_SIZE = int(os.getenv("HISTORY_QUEUE_SIZE", "1000"))
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "50"))
+HISTORY_FLUSH_INTERVAL_MS = float(os.getenv("HISTORY_FLUSH_INTERVAL_MS", "200"))
+# Attempts per batch (e.g. SQLite "database is locked" under load), with
+# exponential backoff starting at HISTORY_RETRY_BACKOFF_MS
+HISTORY_WRITE_ATTEMPTS = int(os.getenv("HISTORY_WRITE_ATTEMPTS", "3"))
+HISTORY_RETRY_BACKOFF_MS = float(os.getenv("HISTORY_RETRY_BACKOFF_MS", "100"))
+
+
+class ChatHistoryRecorder:
+    """
+    Write-behind persistence for chat history.
+
+    record() puts the row on a bounded in-memory queue and returns; a
+    background task writes queued rows in one transaction per batch, once
+    HISTORY_BATCH_SIZE rows are waiting or HISTORY_FLUSH_INTERVAL_MS has
+    passed. When the queue is full, record() waits (backpressure).
+
+    A failed batch is retried with backoff; rows that still fail go back on
+    the queue once (if it has room) and are dropped after that, counted in
+    uet_history_rows_dropped_total.
+    """
+
+    _instance: Optional["ChatHistoryRecorder"] = None
+
+    def __init__(
+        self,
+        queue_size: int = HISTORY_QUEUE_SIZE,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval_ms: float = HISTORY_FLUSH_INTERVAL_MS,
+    ):
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # ids of rows already put back on the queue after a failed batch
+        self._requeued: set[int] = set()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run(), name="history-recorder")
+        HISTORY_QUEUE_DEPTH.set_function(self._queue.qsize)
+        logger.info("Chat history recorder started")
+
+    async def stop(self):
+        """
+        Flushes everything still queued, then stops the writer task.
+        """
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Chat history recorder stopped")
+
+    async def record(self, history: ChatHistoryCreate):
+        if self._task is None:
+            # not started (e.g. running without the app lifespan): write now
+            await self._flush([history])
+            return
+        await self._queue.put(history)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._flush(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch: list[ChatHistoryCreate]):
+        for attempt in range(1, HISTORY_WRITE_ATTEMPTS + 1):
+            try:
+                with stage("db_write"):
+                    async with AsyncSessionLocal() as db:
+                        await create_chat_history_batch(batch, db)
+                logger.info(f"Stored {len(batch)} chat history rows")
+                for history in batch:
+                    self._requeued.discard(id(history))
+                return
+            except Exception as e:
+                error = e
+                if attempt < HISTORY_WRITE_ATTEMPTS:
+                    delay_s = HISTORY_RETRY_BACKOFF_MS / 1000 * 2 ** (attempt - 1)
+                    logger.warning(
+                        f"Failed to store {len(batch)} chat history rows "
+                        f"(attempt {attempt}), retrying in {delay_s * 1000:.0f} ms: {e}"
+                    )
+                    await asyncio.sleep(delay_s)
+
+        # give each row one more chance with a later batch
+        dropped = 0
+        for history in batch:
+            if (
+                self._task is not None
+                and id(history) not in self._requeued
+                and not self._queue.full()
+            ):
+                self._requeued.add(id(history))
+                self._queue.put_nowait(history)
+            else:
+                self._requeued.discard(id(history))
+                dropped += 1
+        if dropped:
+            HISTORY_ROWS_DROPPED.inc(dropped)
+        logger.error(
+            f"Failed to store {len(batch)} chat history rows, "
+            f"requeued {len(batch) - dropped}, dropped {dropped}: {error}"
+        )
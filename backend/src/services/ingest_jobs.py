@@ -0,0 +1,196 @@
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from loguru import logger
+
+from src.database.config import SessionLocal
+from src.database.models import IngestJob
+from src.repository.ingest_job import (
+    claim_ingest_job,
+    create_ingest_job,
+    get_ingest_job,
+    get_queued_ingest_job_ids,
+    heartbeat_ingest_jobs,
+    requeue_stale_ingest_jobs,
+    update_ingest_job,
+)
+from src.services.ingest_service import IngestService
+from src.utils.metrics import INGEST_JOBS, INGEST_STAGE_SECONDS
+
+
+# Ingestion is CPU heavy; one job at a time (across all workers) and half
+# the cores for PDF parsing leaves room for /ask
+INGEST_MAX_CONCURRENCY = int(os.getenv("INGEST_MAX_CONCURRENCY", "1"))
+INGEST_PDF_WORKERS = int(
+    os.getenv("INGEST_PDF_WORKERS", str(max(1, (os.cpu_count() or 1) // 2)))
+)
+
+# How often each worker looks for queued jobs and renews the lease on its
+# running ones, and how old a lease may get before the job is re-queued
+INGEST_JOB_POLL_SECONDS = float(os.getenv("INGEST_JOB_POLL_SECONDS", "2"))
+INGEST_JOB_LEASE_SECONDS = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "60"))
+
+
+class IngestJobQueue:
+    """
+    Runs ingestion jobs on a bounded background pool. The `ingest_jobs`
+    table is the queue: every worker process polls it and claims queued
+    jobs with a conditional UPDATE, so each job runs in one worker and at
+    most INGEST_MAX_CONCURRENCY run at once. Owners heartbeat their running
+    jobs; a job whose heartbeat is older than INGEST_JOB_LEASE_SECONDS (its
+    worker died) is queued again, so jobs survive restarts.
+    """
+
+    _instance: Optional["IngestJobQueue"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = INGEST_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="ingest"
+        )
+        # jobs this process has claimed and not finished
+        self._running: set[str] = set()
+        self._running_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    @classmethod
+    def get_instance(cls):
+        # also called from the threadpool by the sync ingest endpoint
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def submit(self, file_path: str, kind: str = "pdf") -> IngestJob:
+        """
+        Queues a job: "pdf" runs IngestService.ingest_pdf on the file,
+        "chunks" runs IngestService.import_chunks. Whichever worker claims
+        it first runs it.
+        """
+        db = SessionLocal()
+        try:
+            job = create_ingest_job(file_path, db, kind=kind)
+        finally:
+            db.close()
+        logger.info(f"Queued {kind} ingestion job {job.id} for {file_path}")
+        self._wake.set()
+        return job
+
+    def start(self):
+        """
+        Starts polling for jobs, including those left unfinished by a
+        previous run.
+        """
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="ingest-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+
+    def shutdown(self):
+        self._stopped.set()
+        self._wake.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch_loop(self):
+        while not self._stopped.is_set():
+            try:
+                self._dispatch()
+            except Exception as e:
+                logger.error(f"Ingestion job dispatch failed: {e}")
+            self._wake.wait(INGEST_JOB_POLL_SECONDS)
+            self._wake.clear()
+
+    def _dispatch(self):
+        db = SessionLocal()
+        try:
+            with self._running_lock:
+                running = list(self._running)
+            if running and heartbeat_ingest_jobs(running, self.owner, db) < len(running):
+                # our heartbeats stalled past the lease; the job may now run
+                # twice, which ingestion tolerates (it is idempotent)
+                logger.warning("Lost the lease on an ingestion job to another worker")
+
+            stale_before = datetime.now(timezone.utc) - timedelta(
+                seconds=INGEST_JOB_LEASE_SECONDS
+            )
+            requeued = requeue_stale_ingest_jobs(db, stale_before)
+            if requeued:
+                logger.info(f"Re-queued {requeued} ingestion jobs whose worker stopped")
+
+            free = self.max_concurrency - len(running)
+            if free <= 0:
+                return
+            for job_id in get_queued_ingest_job_ids(db, limit=free):
+                job = claim_ingest_job(job_id, self.owner, db, self.max_concurrency)
+                if job is None:
+                    continue
+                logger.info(f"Claimed ingestion job {job.id} for {job.file_path}")
+                with self._running_lock:
+                    self._running.add(job.id)
+                self._executor.submit(self._run, job.id)
+        finally:
+            db.close()
+
+    def _run(self, job_id: str):
+        db = SessionLocal()
+        lock = threading.Lock()
+        stage_timings = {}
+
+        def progress(**fields):
+            if "stage_timings" in fields:
+                stage_timings.update(fields["stage_timings"])
+                fields["stage_timings"] = json.dumps(fields["stage_timings"])
+            with lock:
+                update_ingest_job(job_id, db, **fields)
+
+        try:
+            job = get_ingest_job(job_id, db)
+            if job is None:
+                return
+
+            if job.kind == "chunks":
+                result = IngestService.import_chunks(job.file_path, progress=progress)
+            else:
+                result = IngestService.ingest_pdf(
+                    job.file_path, pdf_workers=INGEST_PDF_WORKERS, progress=progress
+                )
+            update_ingest_job(
+                job_id,
+                db,
+                status="completed",
+                result=json.dumps(result),
+                finished_at=datetime.now(timezone.utc),
+            )
+            logger.info(f"Ingestion job {job_id} completed")
+            INGEST_JOBS.inc(status="completed")
+            for stage, seconds in stage_timings.items():
+                INGEST_STAGE_SECONDS.observe(seconds, stage=stage)
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {e}")
+            db.rollback()
+            update_ingest_job(
+                job_id,
+                db,
+                status="failed",
+                error=str(e),
+                finished_at=datetime.now(timezone.utc),
+            )
+            INGEST_JOBS.inc(status="failed")
+        finally:
+            db.close()
+            with self._running_lock:
+                self._running.discard(job_id)
+            # a slot is free: claim the next queued job now
+            self._wake.set()
@@ -0,0 +1,416 @@
+import hashlib
+import json
+import os
+import time
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+import numpy as np
+from loguru import logger
+
+from src.utils.chunk_files import BundleWriter, iter_chunk_batches
+from src.utils.chuncker import iter_chunk_records, parse_chunk_heading
+from src.utils.pdf_reader import SKIP_PAGES, count_pages, iter_pdf_pages
+from src.vector_store.embedders import EMBEDDING_DIM
+from src.vector_store.factory import get_vector_store
+
+
+# Chunks embedded and written per batch; memory stays flat in document size
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+# Chunks per batch for bulk import and export; imports with embeddings
+# don't wait on the model, so larger batches mean fewer index writes
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1024"))
+
+
+class ChunkFileWriter:
+    """
+    Writes chunks to a JSON array file as they are produced.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, "w", encoding="utf-8")
+        self._file.write("[")
+        self._count = 0
+
+    def write(self, chunks: list[str]):
+        for chunk in chunks:
+            self._file.write(",\n  " if self._count else "\n  ")
+            self._file.write(json.dumps(chunk, ensure_ascii=False))
+            self._count += 1
+
+    def close(self):
+        self._file.write("\n]" if self._count else "]")
+        self._file.close()
+        logger.info(f"Chunks saved to file: {self.file_path}")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def chunk_id(source: str, heading: str, occurrence: int) -> str:
+    key = f"{source}\x00{heading}\x00{occurrence}"
+    return f"{source}_{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+def iter_chunk_ids(source: str, records: Iterable[dict]) -> Iterator[tuple[str, dict]]:
+    """
+    Yields (chunk_id, record). IDs are a hash of the source and the chunk
+    heading ("<department> - <section>"), numbered when a heading repeats.
+    An edited section keeps its ID, so it is updated in place.
+    """
+    seen: dict[str, int] = {}
+    for record in records:
+        heading = f"{record['department']} - {record['section']}"
+        occurrence = seen.get(heading, 0)
+        seen[heading] = occurrence + 1
+        yield chunk_id(source, heading, occurrence), record
+
+
+def chunk_metadata(source: str, record: dict) -> dict:
+    return {
+        "source": source,
+        "department": record["department"],
+        "section": record["section"],
+        "content_hash": content_hash(record["text"]),
+    }
+
+
+def _timed(items: Iterable, timings: dict[str, float], key: str) -> Iterator:
+    """
+    Passes items through, adding the time spent producing them to timings[key].
+    """
+    iterator = iter(items)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            timings[key] = timings.get(key, 0.0) + time.perf_counter() - started
+            return
+        timings[key] = timings.get(key, 0.0) + time.perf_counter() - started
+        yield item
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class IngestService:
+    @staticmethod
+    def ingest_pdf(
+        file_path: str,
+        pdf_workers: Optional[int] = None,
+        progress: Optional[Callable[..., None]] = None,
+        batch_size: int = INGEST_BATCH_SIZE,
+    ) -> dict:
+        """
+        Streams a PDF into the vector store: pages flow into the incremental
+        chunker, and chunks are embedded and written in batches of
+        `batch_size`. Only chunks that are new or changed since the last
+        ingestion of that file are embedded; batches written before a crash
+        are kept, and a re-run skips them.
+
+        `progress` is called with job fields (stage, pages_processed,
+        chunks_embedded, stage_timings, ...) as the pipeline advances.
+        """
+        report = progress or (lambda **fields: None)
+        timings: dict[str, float] = {}
+
+        logger.info(f"Starting PDF ingestion: {file_path}")
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        store = get_vector_store()
+        logger.info("Vector store instance retrieved")
+
+        source = os.path.basename(file_path)
+        existing = store.get_source_metadata(source)
+        # the skipped front matter is never processed, so it doesn't count
+        report(stage="extracting", total_pages=max(0, count_pages(file_path) - SKIP_PAGES))
+
+        pages = _timed(
+            iter_pdf_pages(
+                file_path,
+                skip_pages=SKIP_PAGES,
+                workers=pdf_workers,
+                on_pages=lambda pages: report(pages_processed=pages),
+            ),
+            timings,
+            "extract",
+        )
+        # "chunk" includes the page extraction it waits on; split out below
+        records = _timed(iter_chunk_records(pages), timings, "chunk")
+
+        output_file = os.path.splitext(source)[0] + "_chunks.json"
+        writer = ChunkFileWriter(output_file)
+
+        seen_ids = set()
+        chunks_created = added = updated = embedded = 0
+        try:
+            for batch in _batched(iter_chunk_ids(source, records), batch_size):
+                writer.write([record["text"] for _, record in batch])
+                chunks_created += len(batch)
+
+                changed, relabeled = [], []
+                for id_, record in batch:
+                    seen_ids.add(id_)
+                    metadata = chunk_metadata(source, record)
+                    stored = existing.get(id_)
+                    if stored is None:
+                        changed.append((id_, record["text"], metadata))
+                        added += 1
+                    elif stored.get("content_hash") != metadata["content_hash"]:
+                        changed.append((id_, record["text"], metadata))
+                        updated += 1
+                    elif stored != metadata:
+                        # same text, e.g. stored before department/section
+                        # metadata existed: no need to re-embed
+                        relabeled.append((id_, metadata))
+                        updated += 1
+
+                if changed:
+                    started = time.perf_counter()
+                    documents = [text for _, text, _ in changed]
+                    embeddings = store.embed(documents)
+                    timings["embed"] = timings.get("embed", 0.0) + time.perf_counter() - started
+
+                    started = time.perf_counter()
+                    store.upsert(
+                        ids=[id_ for id_, _, _ in changed],
+                        documents=documents,
+                        embeddings=embeddings,
+                        metadatas=[metadata for _, _, metadata in changed],
+                    )
+                    timings["store"] = timings.get("store", 0.0) + time.perf_counter() - started
+                    embedded += len(changed)
+
+                if relabeled:
+                    store.update_metadata(
+                        ids=[id_ for id_, _ in relabeled],
+                        metadatas=[metadata for _, metadata in relabeled],
+                    )
+
+                report(
+                    stage="embedding",
+                    chunks_total=chunks_created,
+                    chunks_embedded=embedded,
+                    stage_timings=_stage_timings(timings),
+                )
+                logger.info(f"Batch done: {chunks_created} chunks, {embedded} embedded")
+        finally:
+            writer.close()
+
+        if not chunks_created:
+            raise ValueError("No chunks created")
+
+        stale_ids = sorted(set(existing) - seen_ids)
+        if stale_ids:
+            store.delete(stale_ids)
+            logger.info("Stale chunks deleted from ChromaDB")
+
+        unchanged = chunks_created - added - updated
+        report(stage="done", stage_timings=_stage_timings(timings))
+        logger.info(
+            f"PDF ingestion completed: {added} new, {updated} changed, "
+            f"{unchanged} unchanged, {len(stale_ids)} deleted"
+        )
+
+        return {
+            "message": "PDF ingested successfully",
+            "chunks_created": chunks_created,
+            "added": added,
+            "updated": updated,
+            "unchanged": unchanged,
+            "deleted": len(stale_ids),
+            "saved_file": output_file,
+        }
+
+    @staticmethod
+    def import_chunks(
+        file_path: str,
+        source: Optional[str] = None,
+        progress: Optional[Callable[..., None]] = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ) -> dict:
+        """
+        Bulk-loads pre-chunked text from a JSON array, a JSONL file or a
+        chunk bundle (see src/utils/chunk_files.py), without parsing any
+        PDF. Embeddings that come with the chunks are stored as they are
+        unless they were made by a different model; the rest are embedded.
+        Unchanged chunks are skipped, as in ingest_pdf; chunks missing from
+        the file are kept.
+
+        Chunks without an ID get the one ingest_pdf would give them, from
+        their source (their own, else `source`, else the file name) and heading.
+        """
+        report = progress or (lambda **fields: None)
+        timings: dict[str, float] = {}
+
+        logger.info(f"Starting chunk import: {file_path}")
+
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        store = get_vector_store()
+        model_id = store.embedding_model_id()
+        default_source = _import_source(file_path)
+        existing: dict[str, dict[str, dict]] = {}
+        seen: dict[tuple[str, str], int] = {}
+        warned_model = False
+
+        report(stage="importing")
+        chunks_total = added = updated = embedded = 0
+        for records, embeddings in _timed(
+            iter_chunk_batches(file_path, batch_size), timings, "read"
+        ):
+            chunks_total += len(records)
+            changed, relabeled = [], []
+            for row, record in enumerate(records):
+                metadata = dict(record["metadata"])
+                metadata["source"] = metadata.get("source") or source or default_source
+                if "department" not in metadata or "section" not in metadata:
+                    department, section = parse_chunk_heading(record["text"])
+                    if department is not None:
+                        metadata.setdefault("department", department)
+                        metadata.setdefault("section", section)
+                metadata["content_hash"] = content_hash(record["text"])
+
+                id_ = record["id"]
+                if id_ is None:
+                    heading = f"{metadata.get('department')} - {metadata.get('section')}"
+                    occurrence = seen.get((metadata["source"], heading), 0)
+                    seen[(metadata["source"], heading)] = occurrence + 1
+                    id_ = chunk_id(metadata["source"], heading, occurrence)
+
+                if metadata["source"] not in existing:
+                    existing[metadata["source"]] = store.get_source_metadata(metadata["source"])
+                stored = existing[metadata["source"]].get(id_)
+                if stored is None or stored.get("content_hash") != metadata["content_hash"]:
+                    changed.append((row, id_, record["text"], metadata))
+                    if stored is None:
+                        added += 1
+                    else:
+                        updated += 1
+                elif stored != metadata:
+                    relabeled.append((id_, metadata))
+                    updated += 1
+
+            other_models = {r["embedding_model"] for r in records} - {None, model_id}
+            if embeddings is not None and other_models:
+                if not warned_model:
+                    logger.warning(
+                        f"{file_path} was embedded with {', '.join(sorted(other_models))}, "
+                        f"not {model_id}; embedding its chunks again"
+                    )
+                    warned_model = True
+                embeddings = None
+
+            if changed:
+                documents = [text for _, _, text, _ in changed]
+                if embeddings is None:
+                    started = time.perf_counter()
+                    vectors = store.embed(documents)
+                    timings["embed"] = timings.get("embed", 0.0) + time.perf_counter() - started
+                    embedded += len(changed)
+                else:
+                    vectors = embeddings[[row for row, _, _, _ in changed]]
+
+                started = time.perf_counter()
+                store.upsert(
+                    ids=[id_ for _, id_, _, _ in changed],
+                    documents=documents,
+                    embeddings=vectors,
+                    metadatas=[metadata for _, _, _, metadata in changed],
+                    save=False,
+                )
+                timings["store"] = timings.get("store", 0.0) + time.perf_counter() - started
+
+            if relabeled:
+                store.update_metadata(
+                    ids=[id_ for id_, _ in relabeled],
+                    metadatas=[metadata for _, metadata in relabeled],
+                    save=False,
+                )
+
+            report(
+                chunks_total=chunks_total,
+                chunks_embedded=added + updated,
+                stage_timings=dict(timings),
+            )
+
+        if not chunks_total:
+            raise ValueError("No chunks found")
+
+        started = time.perf_counter()
+        store.save()
+        timings["store"] = timings.get("store", 0.0) + time.perf_counter() - started
+
+        unchanged = chunks_total - added - updated
+        report(stage="done", stage_timings=dict(timings))
+        logger.info(
+            f"Chunk import completed: {added} new, {updated} changed, "
+            f"{unchanged} unchanged, {embedded} embedded"
+        )
+
+        return {
+            "message": "Chunks imported successfully",
+            "chunks_imported": chunks_total,
+            "added": added,
+            "updated": updated,
+            "unchanged": unchanged,
+            "embedded": embedded,
+        }
+
+    @staticmethod
+    def export_chunks(out_path: str, batch_size: int = IMPORT_BATCH_SIZE) -> dict:
+        """
+        Writes every stored chunk with its embedding to a chunk bundle at
+        `out_path`, for import_chunks on another node.
+        """
+        store = get_vector_store()
+        count = store.count()
+        logger.info(f"Exporting {count} chunks to {out_path}")
+
+        page = store.get_chunks(0, batch_size)
+        dim = np.asarray(page["embeddings"]).shape[1] if page["ids"] else EMBEDDING_DIM
+        writer = BundleWriter(out_path, count, dim, store.embedding_model_id())
+        offset = 0
+        while page["ids"]:
+            embeddings = np.asarray(page["embeddings"], dtype=np.float32)
+            writer.write(page["ids"], page["documents"], page["metadatas"], embeddings)
+            offset += len(page["ids"])
+            if offset >= count:
+                break
+            page = store.get_chunks(offset, batch_size)
+        writer.close()
+
+        logger.info(f"Chunks exported to {out_path}")
+        return {
+            "message": "Chunks exported successfully",
+            "chunks_exported": count,
+            "path": out_path,
+        }
+
+
+def _import_source(file_path: str) -> str:
+    """
+    Source name for chunks that don't carry one: "X.pdf" for the
+    "X_chunks.json" files written by ingest_pdf, so re-imported chunks
+    get the same IDs, else the file name.
+    """
+    name = os.path.basename(os.path.normpath(file_path))
+    for suffix in ("_chunks.json", "_chunks.jsonl"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)] + ".pdf"
+    return name
+
+
+def _stage_timings(timings: dict[str, float]) -> dict[str, float]:
+    stages = dict(timings)
+    stages["chunk"] = max(0.0, stages.get("chunk", 0.0) - stages.get("extract", 0.0))
+    return stages
@@ -1,14 +1,278 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
 import ollama
+from loguru import logger
 
+from src.utils.metrics import observe_stage
 
-class LLMService:
-    def __init__(self, model: str = "llama3.2"):
-        # "gemma3:4b" or "llama3.2"
+
+# "ollama", or "fake" to answer without a model (offline load tests)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "ollama")
+# "gemma3:4b" or "llama3.2"
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.2")
+# Keep the model (and its cached system-prompt prefix) loaded between requests
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# A fixed context size; changing num_ctx between requests reloads the model
+OLLAMA_NUM_CTX = int(os.getenv("OLLAMA_NUM_CTX", "4096"))
+# Generations Ollama runs at once; set it to the server's OLLAMA_NUM_PARALLEL.
+# Requests beyond it wait here instead of piling up inside Ollama.
+OLLAMA_NUM_PARALLEL = int(os.getenv("OLLAMA_NUM_PARALLEL", "1"))
+
+# How long a request may wait for a free slot, and how long one generation may take
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "60"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))
+FAKE_LLM_TOKENS = int(os.getenv("FAKE_LLM_TOKENS", "32"))
+
+
+class LLMBusyError(Exception):
+    """No generation slot became free within LLM_QUEUE_TIMEOUT_SECONDS."""
+
+
+class LLMTimeoutError(Exception):
+    """A generation took longer than LLM_TIMEOUT_SECONDS."""
+
+
+class OllamaBackend:
+    def __init__(self, model: str = OLLAMA_MODEL, slots: int = OLLAMA_NUM_PARALLEL):
         self.model = model
+        self.slots = slots
+        self.options = {"num_ctx": OLLAMA_NUM_CTX}
+        self.client: Optional[ollama.AsyncClient] = None
 
-    def generate(self, prompt: str) -> str:
-        response = ollama.chat(
+    async def open(self):
+        """
+        Creates the pooled HTTP client; its connections belong to the
+        running event loop. A client left from an earlier loop is closed,
+        so its connection pool does not leak.
+        """
+        stale, self.client = self.client, ollama.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=self.slots * 2,
+                max_keepalive_connections=self.slots * 2,
+            ),
+        )
+        if stale is not None:
+            try:
+                await stale.close()
+            except Exception as e:
+                # its loop may be gone already; the sockets close with it
+                logger.warning(f"Failed to close the previous Ollama client: {e}")
+
+    async def aclose(self):
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+
+    async def chat(self, messages: list[dict]) -> str:
+        response = await self.client.chat(
             model=self.model,
-            messages=[{"role": "user", "content": prompt}],
+            messages=messages,
+            options=self.options,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+        )
+        # without streaming, time to first token is model load + prefill
+        observe_stage(
+            "llm_ttft",
+            ((response.load_duration or 0) + (response.prompt_eval_duration or 0)) / 1e9,
         )
         return response["message"]["content"]
+
+    async def stream(self, messages: list[dict]) -> AsyncIterator[str]:
+        parts = await self.client.chat(
+            model=self.model,
+            messages=messages,
+            options=self.options,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            stream=True,
+        )
+        async for part in parts:
+            content = part["message"]["content"]
+            if content:
+                yield content
+
+
+class FakeLLMBackend:
+    """
+    Answers without a model. Like an Ollama server started with
+    OLLAMA_NUM_PARALLEL=slots, it generates at most `slots` answers at
+    once, each taking latency_ms; extra requests wait inside it.
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = FAKE_LLM_LATENCY_MS,
+        tokens: int = FAKE_LLM_TOKENS,
+        slots: int = OLLAMA_NUM_PARALLEL,
+    ):
+        self.latency_s = latency_ms / 1000
+        self.tokens = tokens
+        self.slots = slots
+        self.calls = 0
+        self._running: Optional[asyncio.Semaphore] = None
+
+    async def open(self):
+        self._running = asyncio.Semaphore(self.slots)
+
+    async def aclose(self):
+        pass
+
+    def _answer(self, messages: list[dict]) -> list[str]:
+        seed = abs(hash(messages[-1]["content"])) % 1000
+        return [f"fake{seed}-{i} " for i in range(self.tokens)]
+
+    async def chat(self, messages: list[dict]) -> str:
+        self.calls += 1
+        async with self._running:
+            await asyncio.sleep(self.latency_s)
+        return "".join(self._answer(messages))
+
+    async def stream(self, messages: list[dict]) -> AsyncIterator[str]:
+        self.calls += 1
+        async with self._running:
+            for token in self._answer(messages):
+                await asyncio.sleep(self.latency_s / self.tokens)
+                yield token
+
+
+def _make_backend():
+    if LLM_BACKEND == "fake":
+        return FakeLLMBackend()
+    if LLM_BACKEND == "ollama":
+        return OllamaBackend()
+    raise ValueError(f"Unknown LLM_BACKEND {LLM_BACKEND!r}")
+
+
+class LLMService:
+    """
+    Long-lived access to the LLM backend.
+
+    Generations are limited to `slots` at once (OLLAMA_NUM_PARALLEL);
+    callers beyond that queue for up to LLM_QUEUE_TIMEOUT_SECONDS and then
+    get LLMBusyError. Each generation is bounded by LLM_TIMEOUT_SECONDS
+    (LLMTimeoutError). Identical generate() calls in flight at the same
+    time share one generation.
+    """
+
+    _instance: Optional["LLMService"] = None
+
+    def __init__(self, backend=None, slots: int = OLLAMA_NUM_PARALLEL):
+        self.backend = backend or _make_backend()
+        self.slots = slots
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self._waiting = 0
+        self._running = 0
+        self._counters = {"generations": 0, "coalesced": 0, "busy": 0, "timeouts": 0}
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            logger.info(f"Creating LLMService ({LLM_BACKEND} backend, {OLLAMA_NUM_PARALLEL} slots)")
+            cls._instance = cls()
+        return cls._instance
+
+    async def _bind_loop(self):
+        # the semaphore and HTTP connections belong to one event loop
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(self.slots)
+            self._inflight = {}
+            await self.backend.open()
+
+    async def aclose(self):
+        await self.backend.aclose()
+        self._loop = None
+
+    @asynccontextmanager
+    async def _slot(self):
+        self._waiting += 1
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), LLM_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            self._counters["busy"] += 1
+            raise LLMBusyError(
+                f"No LLM slot free after {LLM_QUEUE_TIMEOUT_SECONDS:.0f}s"
+            ) from None
+        finally:
+            self._waiting -= 1
+            observe_stage("llm_queue", time.perf_counter() - started)
+
+        self._running += 1
+        try:
+            yield
+        finally:
+            self._running -= 1
+            self._slots.release()
+
+    @staticmethod
+    def _messages(prompt: str, system: Optional[str]) -> list[dict]:
+        # the system message goes first so every request shares its prefix
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    async def _generate(self, messages: list[dict]) -> str:
+        async with self._slot():
+            self._counters["generations"] += 1
+            try:
+                return await asyncio.wait_for(
+                    self.backend.chat(messages), LLM_TIMEOUT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                self._counters["timeouts"] += 1
+                raise LLMTimeoutError(
+                    f"LLM generation took longer than {LLM_TIMEOUT_SECONDS:.0f}s"
+                ) from None
+
+    def _forget(self, key: tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # mark the exception retrieved even if every caller went away
+            task.exception()
+
+    async def generate(self, prompt: str, system: Optional[str] = None) -> str:
+        await self._bind_loop()
+        key = (system, prompt)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._generate(self._messages(prompt, system)))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self._counters["coalesced"] += 1
+        # shielded, so one caller disconnecting does not cancel the others
+        return await asyncio.shield(task)
+
+    async def stream(self, prompt: str, system: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Yields answer tokens as the backend produces them. The slot is held
+        until the stream ends; a stalled stream fails on the HTTP read timeout.
+        """
+        await self._bind_loop()
+        async with self._slot():
+            self._counters["generations"] += 1
+            async for token in self.backend.stream(self._messages(prompt, system)):
+                yield token
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "slots": self.slots,
+            "running": self._running,
+            "waiting": self._waiting,
+            "coalescing": len(self._inflight),
+            **self._counters,
+        }
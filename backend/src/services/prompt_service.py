@@ -1,23 +1,238 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+
+from src.utils.chuncker import split_sentences
+from src.vector_store.bm25 import tokenize
+
+
+# Tokenizer matching the Ollama model, for counting prompt tokens
+PROMPT_TOKENIZER = os.getenv("PROMPT_TOKENIZER", "unsloth/Llama-3.2-1B-Instruct")
+# Max tokens of retrieved context put into one prompt
+PROMPT_CONTEXT_TOKEN_BUDGET = int(os.getenv("PROMPT_CONTEXT_TOKEN_BUDGET", "1500"))
+# Keep only the sentences of each chunk that share terms with the question
+PROMPT_EXTRACTIVE = os.getenv("PROMPT_EXTRACTIVE", "false").lower() == "true"
+
+# A chunk is trimmed to fit only if at least this many tokens are left
+MIN_TRIMMED_CHUNK_TOKENS = 32
+
+
+class TokenCounter:
+    """
+    Counts tokens with the model's tokenizer. Only a cached tokenizer.json
+    is loaded in the calling thread, so no request waits on the Hub; when
+    it isn't cached it is downloaded in the background and counts are a
+    ~4 characters per token estimate until then (or for good, if the
+    download fails).
+    """
+
+    _tokenizer = None
+    _loaded = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls):
+        """
+        Called by the startup warm-up; the first count() calls it otherwise.
+        """
+        with cls._lock:
+            if cls._loaded:
+                return
+            cls._loaded = True
+
+        from huggingface_hub import hf_hub_download
+
+        try:
+            path = hf_hub_download(PROMPT_TOKENIZER, "tokenizer.json", local_files_only=True)
+        except Exception:
+            logger.info(f"Tokenizer {PROMPT_TOKENIZER} not cached, downloading it in the background")
+            threading.Thread(target=cls._download, name="tokenizer-download", daemon=True).start()
+            return
+        cls._set(path)
+
+    @classmethod
+    def _download(cls):
+        from huggingface_hub import hf_hub_download
+
+        try:
+            # fails fast with HF_HUB_OFFLINE=1
+            path = hf_hub_download(PROMPT_TOKENIZER, "tokenizer.json")
+        except Exception as e:
+            logger.warning(
+                f"Could not load tokenizer {PROMPT_TOKENIZER} ({e}); estimating token counts"
+            )
+            return
+        cls._set(path)
+
+    @classmethod
+    def _set(cls, path: str):
+        try:
+            from tokenizers import Tokenizer
+
+            cls._tokenizer = Tokenizer.from_file(path)
+            logger.info(f"Loaded tokenizer {PROMPT_TOKENIZER}")
+        except Exception as e:
+            logger.warning(
+                f"Could not load tokenizer {PROMPT_TOKENIZER} ({e}); estimating token counts"
+            )
+
+    @classmethod
+    def count(cls, text: str) -> int:
+        if not cls._loaded:
+            cls.load()
+        tokenizer = cls._tokenizer
+        if tokenizer is None:
+            return (len(text) + 3) // 4
+        return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+@dataclass
+class PromptBuild:
+    prompt: str
+    system: str
+    context_chunks: list[str]
+    prompt_tokens: int
+    context_tokens: int
+    context_tokens_before: int
+    chunks_dropped: int = 0
+    sentences_removed: int = 0
+
+    usage: dict = field(init=False)
+
+    def __post_init__(self):
+        self.usage = {
+            "prompt_tokens": self.prompt_tokens,
+            "context_tokens": self.context_tokens,
+            "context_tokens_before": self.context_tokens_before,
+            "chunks_used": len(self.context_chunks),
+            "chunks_dropped": self.chunks_dropped,
+            "sentences_removed": self.sentences_removed,
+        }
+
+
+def _sentence_key(sentence: str) -> str:
+    return " ".join(sentence.lower().split())
+
+
+# Fixed instructions, sent as the first (system) message of every chat.
+# Keeping them identical and ahead of the changing context lets Ollama
+# reuse their KV cache instead of re-running prefill on every request.
+SYSTEM_PROMPT = (
+    "You are an expert academic advisor. Answer the question using only the context "
+    "given with it.\n\n"
+    "Instructions:\n"
+    "- Give a clear, complete answer in natural language.\n"
+    "- Check eligibility lists carefully if present.\n"
+    "- Reference context sections if helpful.\n"
+    "- Combine info from multiple chunks if needed.\n"
+    "- Must Say 'The information is not provided in the context.' If the question is not related to a department.\n"
+    "- Do NOT output JSON, braces, lists, or code."
+)
+
+
 class PromptService:
     @staticmethod
     def build(question: str, context_chunks: list[str]) -> str:
+        """
+        Builds the user message; the instructions are in SYSTEM_PROMPT.
+        """
         context = "\n\n".join(context_chunks)
-        
+
         prompt = (
-            "You are an expert academic advisor. Answer the question using only the context below.\n\n"
             f"Context:\n{context}\n\n"
             f"Question:\n{question}\n\n"
-            "Instructions:\n"
-            "- Give a clear, complete answer in natural language.\n"
-            "- Check eligibility lists carefully if present.\n"
-            "- Reference context sections if helpful.\n"
-            "- Combine info from multiple chunks if needed.\n"
-            "- Must Say 'The information is not provided in the context.' If the question is not related to a department.\n"
-            "- Do NOT output JSON, braces, lists, or code.\n\n"
             "Answer:"
         )
         return prompt
 
+    @staticmethod
+    def build_budgeted(
+        question: str,
+        context_chunks: list[str],
+        token_budget: Optional[int] = None,
+        extractive: Optional[bool] = None,
+    ) -> PromptBuild:
+        """
+        Builds the prompt with at most `token_budget` tokens of context.
+
+        Chunks are expected best first. Sentences already seen in a better
+        chunk are removed; with `extractive`, so are sentences sharing no
+        terms with the question (each chunk keeps its first sentence, which
+        names the department and section). Chunks that still don't fit are
+        trimmed sentence by sentence, and the rest are dropped.
+        """
+        token_budget = PROMPT_CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        extractive = PROMPT_EXTRACTIVE if extractive is None else extractive
+        question_terms = set(tokenize(question))
+
+        seen: set[str] = set()
+        kept_chunks: list[str] = []
+        used_tokens = tokens_before = sentences_removed = chunks_dropped = 0
+
+        for chunk in context_chunks:
+            sentences = split_sentences(chunk)
+            tokens_before += TokenCounter.count(chunk)
+
+            if used_tokens >= token_budget:
+                chunks_dropped += 1
+                continue
+
+            kept: list[str] = []
+            kept_keys: set[str] = set()
+            kept_tokens = 0
+            for position, sentence in enumerate(sentences):
+                key = _sentence_key(sentence)
+                if key in seen or key in kept_keys or (
+                    extractive
+                    and position > 0
+                    and not question_terms & set(tokenize(sentence))
+                ):
+                    sentences_removed += 1
+                    continue
+
+                tokens = TokenCounter.count(sentence) + 1
+                if used_tokens + kept_tokens + tokens > token_budget:
+                    sentences_removed += len(sentences) - position
+                    break
+                kept_keys.add(key)
+                kept.append(sentence)
+                kept_tokens += tokens
+
+            trimmed = len(kept) < len(sentences)
+            if not kept or (trimmed and kept_tokens < MIN_TRIMMED_CHUNK_TOKENS and kept_chunks):
+                chunks_dropped += 1
+                continue
+
+            # only sentences that reach the prompt count as seen
+            seen |= kept_keys
+            text = " ".join(kept) if trimmed else chunk
+            kept_chunks.append(text)
+            # counted like tokens_before, so the two compare
+            used_tokens += TokenCounter.count(text)
+
+        assert used_tokens <= tokens_before, (
+            f"context grew from {tokens_before} to {used_tokens} tokens"
+        )
+        prompt = PromptService.build(question, kept_chunks)
+        build = PromptBuild(
+            prompt=prompt,
+            system=SYSTEM_PROMPT,
+            context_chunks=kept_chunks,
+            prompt_tokens=TokenCounter.count(SYSTEM_PROMPT) + TokenCounter.count(prompt),
+            context_tokens=used_tokens,
+            context_tokens_before=tokens_before,
+            chunks_dropped=chunks_dropped,
+            sentences_removed=sentences_removed,
+        )
+        logger.info(
+            f"Prompt: {build.prompt_tokens} tokens, context {tokens_before} -> {used_tokens} tokens, "
+            f"{chunks_dropped} chunks dropped, {sentences_removed} sentences removed"
+        )
+        return build
+
 
 # def build_rag_prompt(question: str, top_chunks: list[str]) -> str:
 #     """
@@ -1,47 +1,301 @@
+import os
 import re
+from typing import Iterable, Iterator, Optional
 
 
-def chunk_text(text: str) -> list[str]:
+# Split sections longer than this many tokens into several chunks
+# (0 keeps each section as one chunk)
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "0"))
+# Tokens of trailing sentences repeated at the start of the next split chunk
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
+
+# Department/institute/centre headers (with optional 'of') and the section
+# headers inside a department, found in the same scan. Both start with a
+# digit; the leading lookahead lets the regex engine skip to digits quickly.
+HEADING_PATTERN = re.compile(
+    r"(?=\d)(?:"
+    r"(?P<department>\d+\.\s*(?:Department|Institute|Center|Centre)(?:\s+of)? [A-Za-z &]+)"
+    r"|\d+\.\d+\s+(?P<section>Introduction|Offered Programs|Eligibility Criteria|Faculty Members)"
+    r")",
+    re.IGNORECASE,
+)
+DEPT_NUMBER_PATTERN = re.compile(r"^\d+\.\s+")
+
+# Candidate sentence boundaries: end punctuation followed by a capital or a
+# bullet, or the start of a bullet point (the leading lookahead again
+# lets the engine skip to whitespace quickly)
+SENTENCE_BOUNDARY_PATTERN = re.compile(r"(?=\s)(?:(?<=[.!?])\s+(?=[A-Z•(\"'])|\s+(?=•))")
+
+# Words and single punctuation marks; close to a word-piece tokenizer's
+# pre-tokenization, without loading one
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Words ending in "." that don't end a sentence
+ABBREVIATIONS = {"dr", "mr", "mrs", "ms", "prof", "engr", "no", "st", "vs", "e.g", "i.e"}
+
+# Text kept from a page with no department header, in case a header
+# starts at the end of one page and continues on the next
+HEADER_CARRY_CHARS = 256
+
+# Sections with less content than this are skipped
+MIN_SECTION_CHARS = 50
+
+
+def _trim(text: str, start: int, end: int) -> tuple[int, int]:
     """
-    Create semantic chunks and return only the text content of each chunk.
+    Offsets of text[start:end].strip().
     """
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
 
-    chunks = []
 
-    # Normalize whitespace
-    text = re.sub(r"\s+", " ", text).strip()
+def _is_abbreviation(text: str, end: int, start: int = 0) -> bool:
+    """
+    True when the word ending at text[end - 1] (a ".") is an abbreviation
+    such as "Dr." or a dotted degree name such as "M.Sc." / "Ph.D.".
+    """
+    word_start = text.rfind(" ", start, end - 1) + 1
+    word = text[max(word_start, start) : end - 1]
+    return "." in word or word.lower() in ABBREVIATIONS
 
-    # Match department/institute/centre headers (with optional 'of')
-    dept_pattern = re.compile(
-        r"(\d+\.\s*(?:Department|Institute|Center|Centre)(?:\s+of)? [A-Za-z &]+)",
-        re.IGNORECASE,
-    )
 
-    dept_splits = dept_pattern.split(text)
+def iter_sentence_spans(
+    text: str, start: int = 0, end: Optional[int] = None
+) -> Iterator[tuple[int, int]]:
+    """
+    Yields (start, end) offsets of the sentences and bullet points in
+    text[start:end], without copying it.
+    """
+    end = len(text) if end is None else end
+    sentence_start = start
+    for match in SENTENCE_BOUNDARY_PATTERN.finditer(text, start, end):
+        boundary = match.start()
+        if text[boundary - 1 : boundary] == "." and _is_abbreviation(text, boundary, start):
+            continue
+        span = _trim(text, sentence_start, boundary)
+        if span[0] < span[1]:
+            yield span
+        sentence_start = match.end()
+    span = _trim(text, sentence_start, end)
+    if span[0] < span[1]:
+        yield span
 
-    for i in range(1, len(dept_splits), 2):
-        dept_title = dept_splits[i].strip()
-        dept_body = dept_splits[i + 1].strip()
 
-        department_name = re.sub(r"^\d+\.\s+", "", dept_title)
+def split_sentences(text: str) -> list[str]:
+    """
+    Splits prospectus text into sentences and bullet points.
+    """
 
-        # Match section headers inside the department
-        section_pattern = re.compile(
-            r"(\d+\.\d+\s+(Introduction|Offered Programs|Eligibility Criteria|Faculty Members))",
-            re.IGNORECASE,
-        )
+    return [text[start:end] for start, end in iter_sentence_spans(text)]
 
-        section_splits = section_pattern.split(dept_body)
 
-        for j in range(1, len(section_splits), 3):
-            section_name = section_splits[j + 1].strip()
-            section_content = section_splits[j + 2].strip()
+def count_tokens(text: str, start: int = 0, end: Optional[int] = None) -> int:
+    """
+    Approximate token count of text[start:end] (see TOKEN_PATTERN).
+    """
+    end = len(text) if end is None else end
+    return len(TOKEN_PATTERN.findall(text, start, end))
+
+
+def _token_windows(
+    text: str, start: int, end: int, max_tokens: int, overlap_tokens: int
+) -> Iterator[tuple[int, int]]:
+    """
+    Yields (start, end) offsets of windows of whole sentences of at most
+    max_tokens tokens, each repeating up to overlap_tokens tokens of the
+    previous window's last sentences. A sentence longer than max_tokens
+    is cut at token boundaries.
+    """
+    # (start, end, tokens) per sentence, or per piece of an overlong one
+    units: list[tuple[int, int, int]] = []
+    for s_start, s_end in iter_sentence_spans(text, start, end):
+        tokens = count_tokens(text, s_start, s_end)
+        if tokens <= max_tokens:
+            units.append((s_start, s_end, tokens))
+            continue
+        matches = list(TOKEN_PATTERN.finditer(text, s_start, s_end))
+        for i in range(0, len(matches), max_tokens):
+            piece = matches[i : i + max_tokens]
+            units.append((piece[0].start(), piece[-1].end(), len(piece)))
+
+    first = 0
+    while first < len(units):
+        last, used = first, 0
+        while last < len(units) and used + units[last][2] <= max_tokens:
+            used += units[last][2]
+            last += 1
+        yield units[first][0], units[last - 1][1]
+        if last == len(units):
+            return
+
+        # step back over trailing units that fit in the overlap, always
+        # moving forward and leaving room for the next new unit
+        next_first, overlap = last, 0
+        room = min(overlap_tokens, max_tokens - units[last][2])
+        while next_first - 1 > first and overlap + units[next_first - 1][2] <= room:
+            next_first -= 1
+            overlap += units[next_first][2]
+        first = next_first
+
+
+# (start, end, department name or None, section name or None)
+Heading = tuple[int, int, Optional[str], Optional[str]]
+
+
+def _headings(text: str, start: int) -> Iterator[Heading]:
+    for match in HEADING_PATTERN.finditer(text, start):
+        department = match.group("department")
+        if department is not None:
+            department = DEPT_NUMBER_PATTERN.sub("", department.strip())
+        yield match.start(), match.end(), department, match.group("section")
+
+
+def _chunk_departments(
+    text: str,
+    headings: list[Heading],
+    end: int,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> Iterator[dict]:
+    """
+    Chunks text[:end] (whitespace-normalized, made of whole departments)
+    by offset, given the headings found in it.
+    """
 
-            if len(section_content) < 50:
-                continue
+    department_name = None
+    for i, (_, heading_end, department, section) in enumerate(headings):
+        if department is not None:
+            department_name = department
+            continue
+        if department_name is None:
+            continue
 
-            # Only the final chunk text
-            chunk_text = f"{department_name} - {section_name}: {section_content}"
-            chunks.append(chunk_text)
+        section_name = section.strip()
+        content_end = headings[i + 1][0] if i + 1 < len(headings) else end
+        content_start, content_end = _trim(text, heading_end, content_end)
+
+        if content_end - content_start < MIN_SECTION_CHARS:
+            continue
+
+        prefix = f"{department_name} - {section_name}: "
+        # every token is at least one character long
+        if (
+            max_tokens
+            and content_end - content_start > max_tokens
+            and count_tokens(text, content_start, content_end) > max_tokens
+        ):
+            windows = _token_windows(
+                text, content_start, content_end, max_tokens, overlap_tokens
+            )
+        else:
+            windows = [(content_start, content_end)]
+
+        for window_start, window_end in windows:
+            yield {
+                "department": department_name,
+                "section": section_name,
+                "text": prefix + text[window_start:window_end],
+            }
+
+
+def iter_chunk_records(
+    pages: Iterable[str],
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> Iterator[dict]:
+    """
+    Incremental chunker: consumes page texts one at a time and yields each
+    department's chunks as soon as the next department header shows up,
+    so only the current department is held in memory. Each page is
+    scanned for headings once, and chunks are cut by offset from the
+    buffer.
+
+    With max_tokens, a section longer than that is split into chunks of
+    whole sentences, overlapping by up to overlap_tokens; every chunk keeps
+    the "<department> - <section>: " prefix.
+
+    Yields {"department": ..., "section": ..., "text": ...} records.
+    """
+
+    buffer = ""
+    # headings in the buffer; the first one is a department once one was seen
+    headings: list[Heading] = []
+
+    for page in pages:
+        # str.split() splits on exactly the characters re matches as \s
+        page = " ".join(page.split())
+        if not page:
+            continue
+
+        # only headings near the end of the buffer can continue on the new
+        # page; forget those and scan again from there
+        scan_from = max(0, len(buffer) - HEADER_CARRY_CHARS)
+        while headings and headings[-1][1] >= scan_from:
+            scan_from = min(scan_from, headings.pop()[0])
+        # don't start inside a number, or "12. Department" would match as "2. ..."
+        while scan_from > 0 and buffer[scan_from - 1].isdigit():
+            scan_from -= 1
+
+        buffer = f"{buffer} {page}" if buffer else page
+        headings += _headings(buffer, scan_from)
+
+        departments = [i for i, h in enumerate(headings) if h[2] is not None]
+        if not departments:
+            buffer, headings = buffer[-HEADER_CARRY_CHARS:], []
+            continue
+
+        # every department before the last header is complete
+        last = departments[-1]
+        last_start = headings[last][0]
+        if len(departments) > 1:
+            yield from _chunk_departments(
+                buffer, headings[:last], last_start, max_tokens, overlap_tokens
+            )
+        buffer = buffer[last_start:]
+        headings = [
+            (start - last_start, end - last_start, department, section)
+            for start, end, department, section in headings[last:]
+        ]
+
+    if buffer:
+        yield from _chunk_departments(buffer, headings, len(buffer), max_tokens, overlap_tokens)
+
+
+def parse_chunk_heading(text: str) -> tuple[Optional[str], Optional[str]]:
+    """
+    (department, section) from a chunk's "<department> - <section>: "
+    prefix, or (None, None) when it has none.
+    """
+    heading, separator, _ = text.partition(": ")
+    department, dash, section = heading.rpartition(" - ")
+    if not separator or not dash or not department or not section:
+        return None, None
+    return department, section
+
+
+def iter_chunks(
+    pages: Iterable[str],
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> Iterator[str]:
+    """
+    Like iter_chunk_records, but yields only the text of each chunk.
+    """
+
+    for record in iter_chunk_records(pages, max_tokens, overlap_tokens):
+        yield record["text"]
+
+
+def chunk_text(
+    text: str,
+    max_tokens: int = CHUNK_MAX_TOKENS,
+    overlap_tokens: int = CHUNK_OVERLAP_TOKENS,
+) -> list[str]:
+    """
+    Create semantic chunks and return only the text content of each chunk.
+    """
 
-    return chunks
+    return list(iter_chunks([text], max_tokens, overlap_tokens))
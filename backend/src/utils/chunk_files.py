@@ -0,0 +1,191 @@
+import json
+import os
+from itertools import islice
+from typing import Iterator, Optional
+
+import numpy as np
+
+
+# A chunk bundle is a directory holding:
+#   chunks.jsonl    {"id", "text", "metadata"} per line
+#   embeddings.npy  float32 (rows, dim) array, row i belongs to line i;
+#                   loaded with mmap_mode="r", so it is read sequentially
+#                   from the page cache rather than parsed
+#   manifest.json   format, version, count, dim and embedding_model; written
+#                   last, so a bundle without one is incomplete
+BUNDLE_FORMAT = "uet-chunk-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CHUNKS_FILE = "chunks.jsonl"
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+def detect_format(path: str) -> str:
+    """
+    "bundle" for a bundle directory, "jsonl" for .jsonl/.ndjson files and
+    "json" otherwise.
+    """
+    if os.path.isdir(path):
+        return "bundle"
+    if path.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    return "json"
+
+
+def _record(item) -> dict:
+    """
+    Normalizes one input chunk to {"id", "text", "metadata", "embedding",
+    "embedding_model"}; accepts plain strings (the *_chunks.json files
+    written by ingestion), CLI records with department/section/text, and
+    exported records with an id and metadata.
+    """
+    if isinstance(item, str):
+        item = {"text": item}
+    elif not isinstance(item, dict) or not isinstance(item.get("text"), str):
+        raise ValueError("Each chunk must be a string or an object with a 'text' field")
+
+    metadata = dict(item.get("metadata") or {})
+    for key in ("source", "department", "section"):
+        if item.get(key) is not None:
+            metadata.setdefault(key, item[key])
+    return {
+        "id": item.get("id"),
+        "text": item["text"],
+        "metadata": metadata,
+        "embedding": item.get("embedding"),
+        "embedding_model": item.get("embedding_model"),
+    }
+
+
+def read_manifest(path: str) -> dict:
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        raise ValueError(f"{path} has no {MANIFEST_FILE}; the export did not finish")
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(f"{path} is not a version {BUNDLE_VERSION} chunk bundle")
+    return manifest
+
+
+def _check_bundle(path: str, manifest: dict, embeddings: Optional[np.ndarray]):
+    """
+    Fails before anything is imported when the manifest, chunks.jsonl and
+    embeddings.npy disagree on the number of chunks or the dimension.
+    """
+    count, dim = manifest.get("count"), manifest.get("dim")
+    with open(os.path.join(path, CHUNKS_FILE), encoding="utf-8") as f:
+        lines = sum(1 for line in f if line.strip())
+    if lines != count:
+        raise ValueError(f"{path}: manifest lists {count} chunks, {CHUNKS_FILE} has {lines}")
+    if embeddings is not None and embeddings.shape != (count, dim):
+        raise ValueError(
+            f"{path}: manifest expects {count}x{dim} embeddings, "
+            f"{EMBEDDINGS_FILE} is {'x'.join(map(str, embeddings.shape))}"
+        )
+
+
+def _iter_jsonl(path: str) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield _record(json.loads(line))
+
+
+def iter_chunk_batches(
+    path: str, batch_size: int
+) -> Iterator[tuple[list[dict], Optional[np.ndarray]]]:
+    """
+    Reads a chunk file or bundle in batches of (records, embeddings).
+    embeddings is a (len(records), dim) float32 array when every record of
+    the batch comes with one, else None.
+    """
+    file_format = detect_format(path)
+
+    if file_format == "bundle":
+        manifest = read_manifest(path)
+        embeddings = None
+        if os.path.exists(os.path.join(path, EMBEDDINGS_FILE)):
+            embeddings = np.load(os.path.join(path, EMBEDDINGS_FILE), mmap_mode="r")
+        _check_bundle(path, manifest, embeddings)
+        records = _iter_jsonl(os.path.join(path, CHUNKS_FILE))
+        start = 0
+        while batch := list(islice(records, batch_size)):
+            for record in batch:
+                record["embedding_model"] = manifest.get("embedding_model")
+            rows = None
+            if embeddings is not None:
+                rows = np.asarray(embeddings[start : start + len(batch)], dtype=np.float32)
+            start += len(batch)
+            yield batch, rows
+        return
+
+    if file_format == "jsonl":
+        records = _iter_jsonl(path)
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError(f"{path} must hold a JSON array of chunks")
+        records = (_record(item) for item in data)
+
+    while batch := list(islice(records, batch_size)):
+        rows = None
+        if all(record["embedding"] is not None for record in batch):
+            rows = np.asarray([record["embedding"] for record in batch], dtype=np.float32)
+        yield batch, rows
+
+
+class BundleWriter:
+    """
+    Writes a chunk bundle; the embeddings array is allocated for `count`
+    rows up front and filled in place.
+    """
+
+    def __init__(self, path: str, count: int, dim: int, embedding_model: str):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.dim = dim
+        self.embedding_model = embedding_model
+        # a re-export must not leave the old manifest on a half-written bundle
+        if os.path.exists(os.path.join(path, MANIFEST_FILE)):
+            os.remove(os.path.join(path, MANIFEST_FILE))
+        self._chunks = open(os.path.join(path, CHUNKS_FILE), "w", encoding="utf-8")
+        self._embeddings = np.lib.format.open_memmap(
+            os.path.join(path, EMBEDDINGS_FILE),
+            mode="w+",
+            dtype=np.float32,
+            shape=(count, dim),
+        )
+        self._count = 0
+
+    def write(self, ids: list[str], documents: list[str], metadatas: list[dict], embeddings):
+        if self._count + len(ids) > len(self._embeddings):
+            raise ValueError("More chunks than counted; the store changed during the export")
+        for id_, document, metadata in zip(ids, documents, metadatas):
+            record = {"id": id_, "text": document, "metadata": metadata or {}}
+            self._chunks.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._embeddings[self._count : self._count + len(ids)] = embeddings
+        self._count += len(ids)
+
+    def close(self):
+        self._chunks.close()
+        if self._count != len(self._embeddings):
+            raise ValueError(
+                f"Expected {len(self._embeddings)} chunks, wrote {self._count}; "
+                "the store changed during the export"
+            )
+        self._embeddings.flush()
+        del self._embeddings
+        with open(os.path.join(self.path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "format": BUNDLE_FORMAT,
+                    "version": BUNDLE_VERSION,
+                    "count": self._count,
+                    "dim": self.dim,
+                    "embedding_model": self.embedding_model,
+                },
+                f,
+                indent=2,
+            )
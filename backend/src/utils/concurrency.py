@@ -0,0 +1,27 @@
+import asyncio
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+
+# Embedding and Chroma calls are CPU/disk bound; they get their own small pool
+# so they can't take over Starlette's threadpool or the event loop.
+BLOCKING_WORKERS = int(
+    os.getenv("BLOCKING_WORKERS", str(min(8, (os.cpu_count() or 1) + 2)))
+)
+
+_executor = ThreadPoolExecutor(
+    max_workers=BLOCKING_WORKERS, thread_name_prefix="rag-blocking"
+)
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Runs a blocking call on the bounded executor and awaits its result.
+    """
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(
+        _executor, partial(ctx.run, func, *args, **kwargs)
+    )
@@ -0,0 +1,273 @@
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+
+
+# Export OpenTelemetry traces (one span per request and stage) when set,
+# e.g. http://localhost:4317
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+
+# Seconds; wide enough for a 1 ms cache hit and a minute-long generation
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60
+)
+# Whole ingest stages for one PDF
+INGEST_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+# Every Counter, Gauge and Histogram, in creation order
+REGISTRY: list = []
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # an unlabelled counter is exported as 0 before its first inc
+        self._values: dict[tuple, float] = {} if labelnames else {(): 0}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge:
+    """
+    A value read when /metrics is scraped, from the function given to
+    set_function (0 until then).
+    """
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._function = None
+        REGISTRY.append(self)
+
+    def set_function(self, function):
+        self._function = function
+
+    def render(self) -> list[str]:
+        value = self._function() if self._function is not None else 0
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {value}",
+        ]
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # label values -> [count per bucket..., sum, count]
+        self._values: dict[tuple, list[float]] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[n]) for n in self.labelnames)
+        with self._lock:
+            series = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._values.items()):
+                for bound, count in zip(self.buckets, series):
+                    le = _labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{le} {count}")
+                le = _labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {series[-1]}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram(
+    "uet_http_request_duration_seconds",
+    "Time until the response headers are sent, by route",
+    ("method", "route", "status"),
+)
+STAGE_SECONDS = Histogram(
+    "uet_stage_duration_seconds",
+    "Time spent in one stage of a request (embed, retrieve, prompt, llm, ...)",
+    ("stage",),
+)
+INGEST_STAGE_SECONDS = Histogram(
+    "uet_ingest_stage_duration_seconds",
+    "Time one ingestion job spent in each stage",
+    ("stage",),
+    INGEST_BUCKETS,
+)
+INGEST_JOBS = Counter(
+    "uet_ingest_jobs_total", "Finished ingestion jobs, by final status", ("status",)
+)
+HISTORY_QUEUE_DEPTH = Gauge(
+    "uet_history_queue_depth", "Chat history rows waiting to be written"
+)
+HISTORY_ROWS_DROPPED = Counter(
+    "uet_history_rows_dropped_total", "Chat history rows lost after every write attempt failed"
+)
+
+
+def render_metrics() -> str:
+    """
+    All metrics of this process in the Prometheus text format.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# Stage timings of the request being handled; run_blocking copies the
+# context, so stages timed in worker threads land in the same dict
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+def _make_tracer():
+    if not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.warning(f"OpenTelemetry packages missing, tracing disabled: {e}")
+        return None
+
+    provider = TracerProvider(resource=Resource.create({"service.name": "uet-query-bot"}))
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT))
+    )
+    trace.set_tracer_provider(provider)
+    logger.info(f"Exporting traces to {OTEL_EXPORTER_OTLP_ENDPOINT}")
+    return trace.get_tracer("uet-query-bot")
+
+
+_tracer = _make_tracer()
+
+
+def _span(name: str):
+    return _tracer.start_as_current_span(name) if _tracer else nullcontext()
+
+
+def observe_stage(name: str, seconds: float):
+    """
+    Records a stage that was timed by the caller.
+    """
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the block as one stage of the current request (and a trace span).
+    """
+    started = time.perf_counter()
+    with _span(name):
+        try:
+            yield
+        finally:
+            observe_stage(name, time.perf_counter() - started)
+
+
+def _server_timing(timings: dict, total: float) -> str:
+    entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items()]
+    entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+def _route_label(scope) -> str:
+    """
+    The request path with path parameters put back as {name}, so e.g. job
+    ids don't each become a separate series.
+    """
+    if "route" not in scope:
+        return "unmatched"
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(str(value), "{" + name + "}")
+    return path
+
+
+class TimingMiddleware:
+    """
+    Times each HTTP request and adds a Server-Timing header listing the
+    stages that finished before the response started. For streaming
+    responses the LLM stages come later and only reach /metrics.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, float] = {}
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", _server_timing(timings, total)
+                )
+                REQUEST_SECONDS.observe(
+                    total,
+                    method=scope["method"],
+                    route=_route_label(scope),
+                    status=message["status"],
+                )
+            await send(message)
+
+        try:
+            with _span(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
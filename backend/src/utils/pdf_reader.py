@@ -1,28 +1,141 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterator, Optional
+
 import pdfplumber
 
 
-def read_pdf(pdf_path: str, skip_pages: int = 4) -> str:
-    """
-    Reads a PDF using pdfplumber and returns cleaned text.
+# Front-matter pages (cover, contents) left out of the text by default
+SKIP_PAGES = 4
 
-    Args:
-        pdf_path (str): Path to PDF file
-        skip_pages (int): Number of initial pages to skip (default: 4)
+# Below this many pages the process pool costs more than it saves
+PARALLEL_MIN_PAGES = 16
 
-    Returns:
-        str: Cleaned text from remaining pages
-    """
+# Each worker gets several smaller page ranges so that slow pages
+# (tables, dense text) don't leave the other workers idle
+RANGES_PER_WORKER = 4
 
+
+def _extract_page_range(pdf_path: str, start: int, stop: Optional[int]) -> list[str]:
+    """
+    Extracts text from pages [start, stop). Opens the file itself so it can
+    run in a worker process.
+    """
     pages_text = []
 
     with pdfplumber.open(pdf_path) as pdf:
-        for page_number, page in enumerate(pdf.pages):
-            if page_number < skip_pages:
-                continue
-
+        for page in pdf.pages[start:stop]:
             text = page.extract_text()
+            page.close()
             if text:
                 # text = clean_text(text)
                 pages_text.append(text)
 
-    return "\n".join(pages_text)
+    return pages_text
+
+
+def _split_range(start: int, stop: int, parts: int) -> list[tuple[int, int]]:
+    size, extra = divmod(stop - start, parts)
+    ranges = []
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        if end > start:
+            ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def count_pages(pdf_path: str) -> int:
+    with pdfplumber.open(pdf_path) as pdf:
+        return len(pdf.pages)
+
+
+def iter_pdf_pages(
+    pdf_path: str,
+    skip_pages: int = SKIP_PAGES,
+    workers: Optional[int] = None,
+    on_pages: Optional[Callable[[int], None]] = None,
+) -> Iterator[str]:
+    """
+    Yields the text of each non-empty page after `skip_pages`, in page order.
+
+    With several workers, page ranges are extracted in worker processes and
+    only a few ranges are kept in flight, so memory stays bounded however
+    long the document is.
+
+    Args:
+        pdf_path (str): Path to PDF file
+        skip_pages (int): Number of initial pages to skip (default: 4)
+        workers (int): Processes used for text extraction
+            (default: CPU count, 1 extracts serially)
+        on_pages (callable): Called with the number of pages extracted so far
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    total_pages = count_pages(pdf_path)
+    page_count = total_pages - skip_pages
+
+    if workers == 1 or page_count < PARALLEL_MIN_PAGES:
+        with pdfplumber.open(pdf_path) as pdf:
+            for done, page in enumerate(pdf.pages[skip_pages:], start=1):
+                text = page.extract_text()
+                # drop pdfplumber's per-page caches once the text is out
+                page.close()
+                if on_pages:
+                    on_pages(done)
+                if text:
+                    # text = clean_text(text)
+                    yield text
+        return
+
+    workers = min(workers, page_count)
+    ranges = deque(_split_range(skip_pages, total_pages, workers * RANGES_PER_WORKER))
+
+    # spawn, not fork: the API process runs threads (torch, the ingest and
+    # query-encoder workers) whose held locks a forked child would inherit
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        in_flight = deque()
+        pages_done = 0
+        while ranges or in_flight:
+            # keep every worker busy plus one range queued behind each
+            while ranges and len(in_flight) < workers * 2:
+                start, stop = ranges.popleft()
+                in_flight.append(
+                    (stop - start, pool.submit(_extract_page_range, pdf_path, start, stop))
+                )
+
+            # waiting on the oldest range keeps page order
+            size, future = in_flight.popleft()
+            pages_text = future.result()
+            pages_done += size
+            if on_pages:
+                on_pages(pages_done)
+            yield from pages_text
+
+
+def read_pdf(
+    pdf_path: str,
+    skip_pages: int = SKIP_PAGES,
+    workers: Optional[int] = None,
+    on_pages: Optional[Callable[[int], None]] = None,
+) -> str:
+    """
+    Reads a PDF using pdfplumber and returns cleaned text.
+
+    Args:
+        pdf_path (str): Path to PDF file
+        skip_pages (int): Number of initial pages to skip (default: 4)
+        workers (int): Processes used for text extraction
+            (default: CPU count, 1 extracts serially)
+        on_pages (callable): Called with the number of pages extracted so far
+
+    Returns:
+        str: Cleaned text from remaining pages
+    """
+
+    return "\n".join(iter_pdf_pages(pdf_path, skip_pages, workers, on_pages))
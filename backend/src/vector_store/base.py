@@ -0,0 +1,269 @@
+import os
+import threading
+import time
+import warnings
+from typing import Literal, Optional
+
+from loguru import logger
+
+from src.vector_store.bm25 import BM25Index
+from src.vector_store.embedders import load_embedder
+from src.vector_store.query_encoder import QueryEncoder
+from src.vector_store.reranker import RERANK_CANDIDATES_PER_K, RERANK_ENABLED, Reranker
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+# keep transformers from importing TensorFlow/Keras next to torch
+os.environ.setdefault("USE_TF", "0")
+warnings.simplefilter(action="ignore", category=FutureWarning)
+warnings.simplefilter(action="ignore", category=UserWarning)
+
+
+BM25_PATH = "./bm25_index.json"
+
+# Reciprocal rank fusion constant and candidates taken from each retriever
+RRF_K = 60
+HYBRID_CANDIDATES_PER_K = 4
+
+RetrievalMode = Literal["vector", "hybrid", "lexical"]
+
+
+def file_signature(path: str) -> Optional[tuple[int, int]]:
+    """
+    (mtime_ns, size) of a file, or None when it does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class SharedVersion:
+    """
+    Version stamp of the stored chunks, kept in a small file so every
+    process using the same store files (API workers, the CLI, the vector
+    store server) sees the writes of the others.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read(self) -> int:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return int(f.read())
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def bump(self) -> int:
+        # only compared for equality; the clock makes stamps from
+        # different processes distinct without a lock
+        version = max(time.time_ns(), self.read() + 1)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(version))
+        os.replace(tmp_path, self.path)
+        return version
+
+
+class BaseVectorStore:
+    """
+    Retrieval shared by the vector store backends: query embedding,
+    lexical (BM25) and hybrid search, and re-ranking.
+
+    Backends keep the vectors and implement _vector_search, the writes
+    (add, upsert, delete, update_metadata, save) and the chunk listing
+    used by ingestion and export (get_source_metadata, count, get_chunks).
+    Every write bumps the shared `version`; reads call _refresh first to
+    pick up files rewritten by other processes.
+    """
+
+    _instance: Optional["BaseVectorStore"] = None
+    _instance_lock = threading.Lock()
+
+    lexical_index: BM25Index
+
+    def __init__(self, version_path: str):
+        self.model = load_embedder()
+        logger.info("Model loaded successfully")
+        self.query_encoder = QueryEncoder(self.model.encode)
+        # the cross-encoder itself loads on first use (or in warm_up)
+        self.reranker = Reranker()
+        # bumped whenever the stored chunks change, so caches built on
+        # retrieval results (in any worker) know when they are stale
+        self._version = SharedVersion(version_path)
+
+    @classmethod
+    def get_instance(cls):
+        # double-checked: concurrent first requests must not each load
+        # the model and open the store
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    logger.info(f"Creating new instance of {cls.__name__}")
+                    cls._instance = cls()
+        return cls._instance
+
+    @property
+    def version(self) -> int:
+        return self._version.read()
+
+    def _refresh(self):
+        """
+        Reloads whatever another process has rewritten on disk since this
+        one last loaded or saved it.
+        """
+
+    def warm_up(self):
+        """
+        Runs one encode and one query, so the first request does not pay
+        for lazy initialization in the model and the store.
+        """
+        embedding = self.embed(["warm-up"])[0]
+        if self.count():
+            self._vector_search([embedding], 1)
+        if RERANK_ENABLED:
+            self.warm_up_reranker()
+
+    def warm_up_reranker(self):
+        """
+        Loads the cross-encoder, which otherwise loads on the first
+        re-ranked request.
+        """
+        self.reranker.warm_up()
+
+    def embed(self, texts: list[str]):
+        return self.model.encode(texts).tolist()
+
+    def embed_query(self, question: str) -> list[float]:
+        """
+        Embeds one question through the LRU cache and micro-batcher.
+        """
+        return self.query_encoder.encode(question)
+
+    def get_top_chunks(
+        self,
+        question: str,
+        top_k: int = 3,
+        embedding: Optional[list[float]] = None,
+        mode: RetrievalMode = "vector",
+        filters: Optional[dict] = None,
+        rerank: Optional[bool] = None,
+    ) -> list[dict]:
+        """
+        Returns the top_k chunks in a structured format:
+        [{"id": id, "document": doc, "score": score, "source": source}, ...]
+
+        mode="vector" ranks by embedding distance (lower score is closer),
+        "lexical" by BM25 and "hybrid" by reciprocal rank fusion of both
+        (higher score is better for those two).
+        `filters` ({"department": ..., "section": ...}) restricts the search
+        to chunks with matching metadata.
+        With `rerank` (default RERANK_ENABLED), top_k * RERANK_CANDIDATES_PER_K
+        candidates are retrieved and a cross-encoder picks the top_k of them
+        (score is then its relevance, higher is better).
+        Pass `embedding` when the question has already been embedded.
+        """
+        if mode != "lexical" and embedding is None:
+            embedding = self.embed_query(question)
+        return self.get_top_chunks_batch(
+            [question], top_k, [embedding], mode=mode, filters=filters, rerank=rerank
+        )[0]
+
+    def get_top_chunks_batch(
+        self,
+        questions: list[str],
+        top_k: int = 3,
+        embeddings: Optional[list[list[float]]] = None,
+        mode: RetrievalMode = "vector",
+        filters: Optional[dict] = None,
+        rerank: Optional[bool] = None,
+    ) -> list[list[dict]]:
+        """
+        get_top_chunks for several questions at once, one result list per
+        question. Missing embeddings are computed in one encoder pass, and
+        the vector search is a single query for all of them.
+        """
+        logger.info(f"Retrieving top {top_k} chunks for {len(questions)} questions ({mode})")
+        self._refresh()
+        filters = {k: v for k, v in (filters or {}).items() if v is not None}
+        if rerank is None:
+            rerank = RERANK_ENABLED
+        n_results = top_k * RERANK_CANDIDATES_PER_K if rerank else top_k
+
+        if mode == "lexical":
+            top_chunks = [self._lexical_search(q, n_results, filters) for q in questions]
+        else:
+            if embeddings is None:
+                embeddings = self.embed(questions)
+
+            if mode == "hybrid":
+                candidates = n_results * HYBRID_CANDIDATES_PER_K
+                vector_results = self._vector_search(embeddings, candidates, filters)
+                top_chunks = [
+                    self._fuse(
+                        [vector, self._lexical_search(question, candidates, filters)],
+                        n_results,
+                    )
+                    for question, vector in zip(questions, vector_results)
+                ]
+            else:
+                top_chunks = self._vector_search(embeddings, n_results, filters)
+
+        if rerank:
+            # one scoring pass and one latency budget for the whole batch
+            top_chunks = self.reranker.rerank_batch(questions, top_chunks, top_k)
+
+        logger.info(f"Retrieved {sum(len(c) for c in top_chunks)} chunks")
+        return top_chunks
+
+    def _vector_search(
+        self,
+        embeddings: list[list[float]],
+        n_results: int,
+        filters: Optional[dict] = None,
+    ) -> list[list[dict]]:
+        """
+        The n_results nearest chunks per embedding, closest first, with
+        squared L2 distance as "score".
+        """
+        raise NotImplementedError
+
+    def _lexical_search(
+        self, question: str, n_results: int, filters: Optional[dict] = None
+    ) -> list[dict]:
+        chunks = []
+        for id_, score in self.lexical_index.search(question, n_results, filters):
+            doc = self.lexical_index.docs[id_]
+            chunks.append(
+                {
+                    "id": id_,
+                    "document": doc["document"],
+                    "score": score,
+                    "source": doc["metadata"].get("source"),
+                }
+            )
+        return chunks
+
+    @staticmethod
+    def _fuse(rankings: list[list[dict]], top_k: int) -> list[dict]:
+        """
+        Reciprocal rank fusion: each ranking adds 1 / (RRF_K + rank).
+        """
+        fused: dict[str, dict] = {}
+        for ranking in rankings:
+            for rank, chunk in enumerate(ranking, start=1):
+                entry = fused.setdefault(chunk["id"], {**chunk, "score": 0.0})
+                entry["score"] += 1 / (RRF_K + rank)
+
+        return sorted(fused.values(), key=lambda c: c["score"], reverse=True)[:top_k]
+
+    def embedding_model_id(self) -> str:
+        return self.model.model_id
+
+    def rerank_stats(self) -> dict:
+        return self.reranker.stats()
+
+    def list_departments(self) -> list[str]:
+        self._refresh()
+        return self.lexical_index.metadata_values("department")
@@ -0,0 +1,159 @@
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Optional
+
+from loguru import logger
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> list[str]:
+    # "Ph.D. Electrical Engineering" -> ["ph", "d", "electrical", "engineering"]
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class BM25Index:
+    """
+    In-process BM25 inverted index over the stored chunks.
+
+    Term weights are precomputed into postings lists, so a query is a few
+    dictionary lookups and additions per query term. Postings are rebuilt
+    lazily after the document set changes.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # id -> {"document": str, "metadata": dict, "terms": {term: tf}, "length": int}
+        self.docs: dict[str, dict] = {}
+        self._postings: Optional[dict[str, list[tuple[str, float]]]] = None
+        self._lock = threading.Lock()
+        # store version the saved file matches (see SharedVersion)
+        self.version: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def upsert(self, ids: list[str], documents: list[str], metadatas: list[dict]):
+        with self._lock:
+            for id_, document, metadata in zip(ids, documents, metadatas):
+                tokens = tokenize(document)
+                self.docs[id_] = {
+                    "document": document,
+                    "metadata": metadata or {},
+                    "terms": dict(Counter(tokens)),
+                    "length": len(tokens),
+                }
+            self._postings = None
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict]):
+        with self._lock:
+            for id_, metadata in zip(ids, metadatas):
+                if id_ in self.docs:
+                    self.docs[id_]["metadata"] = metadata or {}
+
+    def metadata_values(self, key: str) -> list[str]:
+        with self._lock:
+            return sorted(
+                {d["metadata"][key] for d in self.docs.values() if d["metadata"].get(key)}
+            )
+
+    def delete(self, ids: list[str]):
+        with self._lock:
+            for id_ in ids:
+                self.docs.pop(id_, None)
+            self._postings = None
+
+    def _build_postings(self) -> dict[str, list[tuple[str, float]]]:
+        doc_count = len(self.docs)
+        avg_length = sum(d["length"] for d in self.docs.values()) / max(doc_count, 1)
+
+        doc_freq: Counter = Counter()
+        for doc in self.docs.values():
+            doc_freq.update(doc["terms"].keys())
+
+        postings: dict[str, list[tuple[str, float]]] = {}
+        for id_, doc in self.docs.items():
+            norm = self.k1 * (1 - self.b + self.b * doc["length"] / max(avg_length, 1e-9))
+            for term, tf in doc["terms"].items():
+                df = doc_freq[term]
+                idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+                weight = idf * tf * (self.k1 + 1) / (tf + norm)
+                postings.setdefault(term, []).append((id_, weight))
+        return postings
+
+    def search(
+        self, query: str, top_k: int, where: Optional[dict] = None
+    ) -> list[tuple[str, float]]:
+        """
+        Returns up to top_k (id, score) pairs, best first.
+        """
+        with self._lock:
+            if self._postings is None:
+                self._postings = self._build_postings()
+            postings = self._postings
+
+            scores: dict[str, float] = {}
+            for term in set(tokenize(query)):
+                for id_, weight in postings.get(term, ()):
+                    scores[id_] = scores.get(id_, 0.0) + weight
+
+            if where:
+                scores = {
+                    id_: score
+                    for id_, score in scores.items()
+                    if all(
+                        self.docs[id_]["metadata"].get(k) == v for k, v in where.items()
+                    )
+                }
+
+        return heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+
+    def save(self, path: str, version: Optional[int] = None):
+        with self._lock:
+            self.version = version
+            data = {
+                "k1": self.k1,
+                "b": self.b,
+                "version": version,
+                "docs": {
+                    id_: {
+                        "document": d["document"],
+                        "metadata": d["metadata"],
+                        "terms": d["terms"],
+                    }
+                    for id_, d in self.docs.items()
+                },
+            }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # dumps uses the C encoder; dump(data, f) streams through the
+            # pure-Python one and is several times slower on large indexes
+            f.write(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        if not os.path.exists(path):
+            return cls()
+
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+
+        index = cls(k1=data["k1"], b=data["b"])
+        index.version = data.get("version")
+        for id_, d in data["docs"].items():
+            index.docs[id_] = {
+                "document": d["document"],
+                "metadata": d["metadata"],
+                "terms": d["terms"],
+                "length": sum(d["terms"].values()),
+            }
+        logger.info(f"Loaded BM25 index with {len(index)} documents from {path}")
+        return index
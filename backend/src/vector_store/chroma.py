@@ -1,18 +1,30 @@
-import os
-import warnings
 from typing import Optional
+
 from loguru import logger
 
-os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
-warnings.simplefilter(action="ignore", category=FutureWarning)
-warnings.simplefilter(action="ignore", category=UserWarning)
+from src.vector_store.base import BM25_PATH, BaseVectorStore, file_signature
+from src.vector_store.bm25 import BM25Index
 
 
 CHROMA_PATH = "./chroma_db"
+VERSION_PATH = "./vector_store.version"
 COLLECTION_NAME = "text_chunks"
 
 
-class ChromaVectorStore:
+def _chroma_where(filters: Optional[dict]) -> Optional[dict]:
+    """
+    Turns {"department": ..., "section": ...} equality filters into a
+    Chroma `where` clause.
+    """
+    conditions = [{k: v} for k, v in (filters or {}).items() if v is not None]
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
+
+class ChromaVectorStore(BaseVectorStore):
     _instance: Optional["ChromaVectorStore"] = None
 
     def __init__(self):
@@ -20,15 +32,13 @@ class ChromaVectorStore:
 
         # import here to avoid startup cost
         import chromadb
-        from sentence_transformers import SentenceTransformer
 
-        logger.info("Loading SentenceTransformer model...")
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
-        logger.info("Model loaded successfully")
+        super().__init__(VERSION_PATH)
 
         logger.info("Creating PersistentClient for ChromaDB...")
         self.client = chromadb.PersistentClient(path=CHROMA_PATH)
         self.collection = self._get_or_create(COLLECTION_NAME)
+        self.lexical_index = self._load_lexical_index()
         logger.info("ChromaVectorStore initialized successfully")
 
     def _get_or_create(self, name: str):
@@ -39,40 +49,58 @@ class ChromaVectorStore:
         logger.info(f"Collection '{name}' does not exist, creating it")
         return self.client.create_collection(name)
 
-    @classmethod
-    def get_instance(cls):
-        if cls._instance is None:
-            logger.info("Creating new instance of ChromaVectorStore")
-            cls._instance = cls()
-        else:
-            logger.info("Using existing instance of ChromaVectorStore")
-        return cls._instance
-
-    def embed(self, texts: list[str]):
-        return self.model.encode(texts).tolist()
-
-    def get_top_chunks(self, question: str, top_k: int = 3) -> list[dict]:
-        """
-        Returns the top_k chunks in a structured format:
-        [{"document": doc, "score": score, "source": source}, ...]
-        """
-        logger.info(f"Retrieving top {top_k} chunks for question")
-        question_embedding = self.model.encode([question]).tolist()
-
+    def _load_lexical_index(self) -> BM25Index:
+        # upserts made with save=False and not saved yet
+        self._unsaved = False
+        index = BM25Index.load(BM25_PATH)
+        self._lexical_signature = file_signature(BM25_PATH)
+        # a write that never reached the BM25 file (a bulk load that stopped
+        # before save(), a crash) leaves it with an older version
+        version = self.version
+        if index.version != version or len(index) != self.collection.count():
+            logger.info("BM25 index out of sync with ChromaDB, rebuilding it")
+            results = self.collection.get(include=["documents", "metadatas"])
+            index = BM25Index()
+            index.upsert(results["ids"], results["documents"], results["metadatas"])
+            self.lexical_index = index
+            self._save_lexical_index(version)
+        return index
+
+    def _save_lexical_index(self, version: int):
+        self.lexical_index.save(BM25_PATH, version)
+        self._lexical_signature = file_signature(BM25_PATH)
+        self._unsaved = False
+
+    def _refresh(self):
+        if not self._unsaved and file_signature(BM25_PATH) != self._lexical_signature:
+            logger.info("BM25 index changed on disk, reloading it")
+            self._lexical_signature = file_signature(BM25_PATH)
+            self.lexical_index = BM25Index.load(BM25_PATH)
+
+    def _vector_search(
+        self,
+        embeddings: list[list[float]],
+        n_results: int,
+        filters: Optional[dict] = None,
+    ) -> list[list[dict]]:
         results = self.collection.query(
-            query_embeddings=question_embedding, n_results=top_k
+            query_embeddings=embeddings,
+            n_results=n_results,
+            where=_chroma_where(filters),
         )
 
-        top_chunks = [
-            {"document": doc, "score": score, "source": meta["source"]}
-            for doc, score, meta in zip(
-                results["documents"][0],
-                results["distances"][0],
-                results["metadatas"][0],
+        return [
+            [
+                {"id": id_, "document": doc, "score": score, "source": meta["source"]}
+                for id_, doc, score, meta in zip(ids, docs, distances, metas)
+            ]
+            for ids, docs, distances, metas in zip(
+                results["ids"],
+                results["documents"],
+                results["distances"],
+                results["metadatas"],
             )
         ]
-        logger.info(f"Retrieved {len(top_chunks)} chunks")
-        return top_chunks
 
     def add(self, ids, documents, embeddings, metadatas):
         logger.info(f"Adding {len(documents)} documents to ChromaDB")
@@ -82,4 +110,66 @@ class ChromaVectorStore:
             embeddings=embeddings,
             metadatas=metadatas,
         )
+        self.lexical_index.upsert(ids, documents, metadatas)
+        self._save_lexical_index(self._version.bump())
         logger.info("Documents added successfully")
+
+    def upsert(self, ids, documents, embeddings, metadatas, save: bool = True):
+        """
+        Bulk loads pass save=False and call save() at the end; if they stop
+        early, the BM25 index is rebuilt from the collection on load.
+        """
+        logger.info(f"Upserting {len(documents)} documents to ChromaDB")
+        self.collection.upsert(
+            ids=ids,
+            documents=documents,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+        self.lexical_index.upsert(ids, documents, metadatas)
+        version = self._version.bump()
+        if save:
+            self._save_lexical_index(version)
+        else:
+            self._unsaved = True
+        logger.info("Documents upserted successfully")
+
+    def delete(self, ids: list[str]):
+        logger.info(f"Deleting {len(ids)} documents from ChromaDB")
+        self.collection.delete(ids=ids)
+        self.lexical_index.delete(ids)
+        self._save_lexical_index(self._version.bump())
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict], save: bool = True):
+        logger.info(f"Updating metadata of {len(ids)} documents in ChromaDB")
+        self.collection.update(ids=ids, metadatas=metadatas)
+        self.lexical_index.update_metadata(ids, metadatas)
+        version = self._version.bump()
+        if save:
+            self._save_lexical_index(version)
+        else:
+            self._unsaved = True
+
+    def save(self):
+        self._save_lexical_index(self.version)
+
+    def get_source_metadata(self, source: str) -> dict[str, dict]:
+        """
+        Returns {chunk_id: metadata} for every chunk stored for `source`.
+        """
+        results = self.collection.get(where={"source": source}, include=["metadatas"])
+        return {
+            id_: meta or {} for id_, meta in zip(results["ids"], results["metadatas"])
+        }
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def get_chunks(self, offset: int, limit: int) -> dict:
+        """
+        One page of stored chunks, with their embeddings, for export:
+        {"ids": [...], "documents": [...], "metadatas": [...], "embeddings": array}.
+        """
+        return self.collection.get(
+            include=["documents", "metadatas", "embeddings"], offset=offset, limit=limit
+        )
@@ -0,0 +1,162 @@
+import os
+import zlib
+from typing import Optional
+
+import numpy as np
+from loguru import logger
+
+from src.vector_store.bm25 import tokenize
+
+
+# "torch" (SentenceTransformer), "onnx" (onnxruntime, fp32),
+# "onnx-int8" (onnxruntime, dynamically quantized weights; needs `pip install onnx`
+# the first time, to write the quantized model) or "hash" (no model; offline
+# benchmarks and CI only)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# onnxruntime intra-op threads; 0 lets onnxruntime pick one per core
+EMBEDDING_THREADS = int(os.getenv("EMBEDDING_THREADS", "0"))
+# all-MiniLM-L6-v2 is used with 256 word pieces in sentence-transformers
+MAX_SEQ_LENGTH = 256
+ONNX_BATCH_SIZE = 32
+EMBEDDING_DIM = 384
+
+
+class TorchEmbedder:
+    def __init__(self, model_name: str = EMBEDDING_MODEL):
+        # import here to avoid startup cost
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        # which vectors this produces; stored with exported embeddings
+        self.model_id = model_name
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        return self.model.encode(texts)
+
+
+class OnnxEmbedder:
+    """
+    all-MiniLM-L6-v2 on onnxruntime, without importing torch.
+
+    Uses ChromaDB's ONNX export of the same weights, so its vectors match
+    the torch backend and existing collections stay valid. Batches are
+    padded to their longest text rather than to MAX_SEQ_LENGTH.
+    """
+
+    # same vectors as TorchEmbedder, up to float and int8 rounding
+    model_id = EMBEDDING_MODEL
+
+    def __init__(self, quantized: bool = False, threads: int = EMBEDDING_THREADS):
+        import onnxruntime as ort
+        from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2
+        from tokenizers import Tokenizer
+
+        # downloads the export to ~/.cache/chroma on first use
+        export = ONNXMiniLM_L6_V2()
+        export._download_model_if_not_exists()
+        model_dir = os.path.join(export.DOWNLOAD_PATH, export.EXTRACTED_FOLDER_NAME)
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+
+        model_path = os.path.join(model_dir, "model.onnx")
+        if quantized:
+            model_path = _quantize(model_path)
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        batches = [
+            self._encode_batch(texts[i : i + ONNX_BATCH_SIZE])
+            for i in range(0, len(texts), ONNX_BATCH_SIZE)
+        ]
+        if not batches:
+            return np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+        return np.concatenate(batches)
+
+    def _encode_batch(self, texts: list[str]) -> np.ndarray:
+        encoded = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+        inputs = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.zeros_like(input_ids),
+        }
+        hidden = self.session.run(
+            None, {k: v for k, v in inputs.items() if k in self.input_names}
+        )[0]
+
+        # mean pooling over real tokens, then L2 normalization
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+
+class HashingEmbedder:
+    """
+    Hashed bag-of-words vectors, so the pipeline runs with no model files
+    at all. Retrieval quality is far below MiniLM; only use it to measure
+    everything around the model offline.
+    """
+
+    model_id = f"hashing-{EMBEDDING_DIM}"
+
+    def encode(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), EMBEDDING_DIM), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for term in tokenize(text):
+                vectors[row, zlib.crc32(term.encode()) % EMBEDDING_DIM] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.clip(norms, 1e-12, None)
+
+
+def _quantize(model_path: str) -> str:
+    """
+    Writes an int8 (dynamic quantization) copy of the model next to it
+    once, and returns its path.
+    """
+    quantized_path = model_path.replace(".onnx", ".int8.onnx")
+    if os.path.exists(quantized_path):
+        return quantized_path
+
+    try:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+    except ImportError as e:
+        raise RuntimeError(
+            "EMBEDDING_BACKEND=onnx-int8 needs the onnx package to quantize "
+            "the model (pip install onnx)"
+        ) from e
+
+    logger.info(f"Quantizing {model_path} to int8")
+    tmp_path = quantized_path + ".tmp"
+    quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+    os.replace(tmp_path, quantized_path)
+    return quantized_path
+
+
+def load_embedder(backend: Optional[str] = None):
+    """
+    Returns an object whose encode(texts) gives one normalized vector
+    (numpy row) per text: all-MiniLM-L6-v2, or hashed terms for "hash".
+    """
+    backend = backend or EMBEDDING_BACKEND
+    logger.info(f"Loading embedding model ({backend} backend)...")
+    if backend == "torch":
+        return TorchEmbedder()
+    if backend == "onnx":
+        return OnnxEmbedder()
+    if backend == "onnx-int8":
+        return OnnxEmbedder(quantized=True)
+    if backend == "hash":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}")
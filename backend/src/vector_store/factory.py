@@ -0,0 +1,36 @@
+import os
+
+from src.vector_store.remote import VECTOR_STORE_SOCKET, RemoteVectorStore
+
+
+# "chroma" (HNSW index in ./chroma_db) or "numpy" (exact search over a
+# memory-mapped matrix in ./numpy_store, for small collections)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "chroma").lower()
+
+
+def get_local_vector_store():
+    """
+    The in-process store selected by VECTOR_STORE_BACKEND.
+    """
+    # import here so workers using the server never import the model code
+    if VECTOR_STORE_BACKEND == "numpy":
+        from src.vector_store.numpy_store import NumpyVectorStore
+
+        return NumpyVectorStore.get_instance()
+    if VECTOR_STORE_BACKEND == "chroma":
+        from src.vector_store.chroma import ChromaVectorStore
+
+        return ChromaVectorStore.get_instance()
+    raise ValueError(
+        f"Unknown VECTOR_STORE_BACKEND {VECTOR_STORE_BACKEND!r} (expected chroma or numpy)"
+    )
+
+
+def get_vector_store():
+    """
+    The vector store the app uses: the shared server when
+    VECTOR_STORE_SOCKET is set, otherwise the in-process store.
+    """
+    if VECTOR_STORE_SOCKET:
+        return RemoteVectorStore.get_instance()
+    return get_local_vector_store()
@@ -0,0 +1,303 @@
+import json
+import os
+import threading
+from typing import NamedTuple, Optional
+
+import numpy as np
+from loguru import logger
+
+from src.vector_store.base import BaseVectorStore, file_signature
+from src.vector_store.bm25 import BM25Index
+from src.vector_store.embedders import EMBEDDING_DIM
+
+
+# Directory of the numpy backend: embeddings.npy (float32 rows), ids.json
+# (the chunk id of each row) and its own BM25 index, which also holds the
+# chunk text and metadata
+NUMPY_STORE_PATH = os.getenv("NUMPY_STORE_PATH", "./numpy_store")
+
+
+class _Snapshot(NamedTuple):
+    ids: list[str]
+    # (len(ids), dim) float32, L2-normalized rows
+    matrix: np.ndarray
+    # metadata key -> value per row, filled in by filtered queries
+    columns: dict
+
+
+def _normalize(vectors) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.clip(norms, 1e-12, None)
+
+
+class NumpyVectorStore(BaseVectorStore):
+    """
+    Exact nearest neighbour search over one contiguous float32 matrix of
+    normalized embeddings: a query batch is one matrix product and an
+    argpartition, with no index to build, tune or keep in SQLite. Meant
+    for small collections (the UET prospectus is ~100 chunks); the cost
+    grows linearly with the number of chunks.
+
+    embeddings.npy is memory-mapped on load, so startup reads it straight
+    from the page cache and worker processes share one copy. Writes build
+    a new matrix and swap it in; queries keep using the snapshot they
+    started with.
+    """
+
+    _instance: Optional["NumpyVectorStore"] = None
+
+    def __init__(self, path: str = NUMPY_STORE_PATH):
+        logger.info("Initializing NumpyVectorStore...")
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        super().__init__(self._file("version"))
+
+        self._write_lock = threading.Lock()
+        # upserts made with save=False and not saved yet
+        self._unsaved = False
+        self.lexical_index, self._snapshot = self._load(repair=True)
+        logger.info(f"NumpyVectorStore initialized with {len(self._snapshot.ids)} chunks")
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _signature(self):
+        return file_signature(self._file("ids.json")), file_signature(self._file("bm25_index.json"))
+
+    def _load(self, repair: bool) -> Optional[tuple[BM25Index, _Snapshot]]:
+        """
+        Loads the BM25 index and the matrix. When they disagree (a crash
+        between saving them, or another process saving right now), repair
+        keeps the chunks present in both and saves that; otherwise None is
+        returned.
+        """
+        signature = self._signature()
+        lexical_index = BM25Index.load(self._file("bm25_index.json"))
+        ids_path = self._file("ids.json")
+        if os.path.exists(ids_path):
+            with open(ids_path, encoding="utf-8") as f:
+                ids = json.load(f)
+            matrix = np.load(self._file("embeddings.npy"), mmap_mode="r")
+        else:
+            ids, matrix = [], np.zeros((0, EMBEDDING_DIM), dtype=np.float32)
+
+        docs = lexical_index.docs
+        if len(ids) == len(matrix) == len(docs) and all(id_ in docs for id_ in ids):
+            self._loaded_signature = signature
+            return lexical_index, _Snapshot(ids, matrix, {})
+        if not repair:
+            return None
+        if len(ids) != len(matrix):
+            raise ValueError(
+                f"{self.path}: {len(ids)} ids for {len(matrix)} embeddings; "
+                "re-import the chunks into a new directory"
+            )
+
+        keep = [row for row, id_ in enumerate(ids) if id_ in docs]
+        logger.warning(
+            f"{self.path}: embeddings and BM25 index out of sync, keeping "
+            f"{len(keep)} chunks present in both"
+        )
+        ids = [ids[row] for row in keep]
+        lexical_index.delete(list(set(docs) - set(ids)))
+        self.lexical_index = lexical_index
+        self._save(_Snapshot(ids, np.ascontiguousarray(matrix[keep]), {}), self._version.bump())
+        return lexical_index, self._snapshot
+
+    def _refresh(self):
+        if self._unsaved or self._signature() == self._loaded_signature:
+            return
+        with self._write_lock:
+            if self._signature() == self._loaded_signature:
+                return
+            loaded = self._load(repair=False)
+            if loaded is None:
+                # caught another process mid-save; retry on the next read
+                return
+            logger.info(f"{self.path} changed on disk, reloaded it")
+            self.lexical_index, self._snapshot = loaded
+
+    def _save(self, snapshot: _Snapshot, version: int, embeddings: bool = True):
+        """
+        Writes the snapshot (and the BM25 index) to disk, then maps the
+        saved matrix back in place of the in-memory one.
+        """
+        if embeddings:
+            tmp_path = self._file("embeddings.tmp.npy")
+            np.save(tmp_path, snapshot.matrix)
+            os.replace(tmp_path, self._file("embeddings.npy"))
+            tmp_path = self._file("ids.json.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot.ids, f)
+            os.replace(tmp_path, self._file("ids.json"))
+            snapshot = snapshot._replace(
+                matrix=np.load(self._file("embeddings.npy"), mmap_mode="r")
+            )
+        self.lexical_index.save(self._file("bm25_index.json"), version)
+        self._loaded_signature = self._signature()
+        self._snapshot = snapshot
+        self._unsaved = False
+
+    def _mask(self, snapshot: _Snapshot, filters: dict) -> np.ndarray:
+        mask = np.ones(len(snapshot.ids), dtype=bool)
+        for key, value in filters.items():
+            column = snapshot.columns.get(key)
+            if column is None:
+                docs = self.lexical_index.docs
+                column = np.array(
+                    [docs[id_]["metadata"].get(key) if id_ in docs else None for id_ in snapshot.ids],
+                    dtype=object,
+                )
+                snapshot.columns[key] = column
+            mask &= column == value
+        return mask
+
+    def _vector_search(
+        self,
+        embeddings: list[list[float]],
+        n_results: int,
+        filters: Optional[dict] = None,
+    ) -> list[list[dict]]:
+        snapshot = self._snapshot
+        queries = _normalize(embeddings)
+
+        rows = None
+        matrix = snapshot.matrix
+        if filters:
+            rows = np.flatnonzero(self._mask(snapshot, filters))
+            matrix = matrix[rows]
+
+        k = min(n_results, len(matrix))
+        if k == 0:
+            return [[] for _ in queries]
+
+        # cosine similarity of every query with every chunk
+        similarities = queries @ matrix.T
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+        top_similarities = np.take_along_axis(similarities, top, axis=1)
+        order = np.argsort(-top_similarities, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_similarities = np.take_along_axis(top_similarities, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+
+        docs = self.lexical_index.docs
+        results = []
+        for query_rows, query_similarities in zip(top, top_similarities):
+            chunks = []
+            for row, similarity in zip(query_rows, query_similarities):
+                id_ = snapshot.ids[row]
+                doc = docs.get(id_)
+                if doc is None:
+                    # deleted after this query took its snapshot
+                    continue
+                chunks.append(
+                    {
+                        "id": id_,
+                        "document": doc["document"],
+                        # squared L2 distance between unit vectors, as Chroma reports
+                        "score": max(0.0, float(2 - 2 * similarity)),
+                        "source": doc["metadata"].get("source"),
+                    }
+                )
+            results.append(chunks)
+        return results
+
+    def add(self, ids, documents, embeddings, metadatas):
+        self.upsert(ids, documents, embeddings, metadatas)
+
+    def upsert(self, ids, documents, embeddings, metadatas, save: bool = True):
+        """
+        Bulk loads pass save=False and call save() at the end; until then
+        the new rows live only in memory.
+        """
+        logger.info(f"Upserting {len(documents)} documents to the numpy store")
+        vectors = _normalize(embeddings)
+        with self._write_lock:
+            snapshot = self._snapshot
+            new_ids = list(snapshot.ids)
+            rows = {id_: row for row, id_ in enumerate(new_ids)}
+            matrix = np.array(snapshot.matrix, dtype=np.float32)
+
+            # the last occurrence of an id in the batch wins
+            latest = {id_: i for i, id_ in enumerate(ids)}
+            updates = [(rows[id_], i) for id_, i in latest.items() if id_ in rows]
+            appended = [(id_, i) for id_, i in latest.items() if id_ not in rows]
+            if updates:
+                matrix[[row for row, _ in updates]] = vectors[[i for _, i in updates]]
+            if appended:
+                matrix = np.concatenate([matrix, vectors[[i for _, i in appended]]])
+                new_ids += [id_ for id_, _ in appended]
+
+            self.lexical_index.upsert(ids, documents, metadatas)
+            snapshot = _Snapshot(new_ids, matrix, {})
+            version = self._version.bump()
+            if save:
+                self._save(snapshot, version)
+            else:
+                self._snapshot = snapshot
+                self._unsaved = True
+        logger.info("Documents upserted successfully")
+
+    def delete(self, ids: list[str]):
+        logger.info(f"Deleting {len(ids)} documents from the numpy store")
+        with self._write_lock:
+            snapshot = self._snapshot
+            deleted = set(ids)
+            keep = [row for row, id_ in enumerate(snapshot.ids) if id_ not in deleted]
+            self._snapshot = _Snapshot(
+                [snapshot.ids[row] for row in keep],
+                np.ascontiguousarray(snapshot.matrix[keep]),
+                {},
+            )
+            self.lexical_index.delete(ids)
+            self._save(self._snapshot, self._version.bump())
+
+    def update_metadata(self, ids: list[str], metadatas: list[dict], save: bool = True):
+        logger.info(f"Updating metadata of {len(ids)} documents in the numpy store")
+        with self._write_lock:
+            self.lexical_index.update_metadata(ids, metadatas)
+            # same rows, but the filter columns are stale
+            self._snapshot = self._snapshot._replace(columns={})
+            version = self._version.bump()
+            if save:
+                self._save(self._snapshot, version, embeddings=False)
+            else:
+                self._unsaved = True
+
+    def save(self):
+        with self._write_lock:
+            self._save(self._snapshot, self.version)
+
+    def get_source_metadata(self, source: str) -> dict[str, dict]:
+        """
+        Returns {chunk_id: metadata} for every chunk stored for `source`.
+        """
+        self._refresh()
+        return {
+            id_: doc["metadata"]
+            for id_, doc in list(self.lexical_index.docs.items())
+            if doc["metadata"].get("source") == source
+        }
+
+    def count(self) -> int:
+        self._refresh()
+        return len(self._snapshot.ids)
+
+    def get_chunks(self, offset: int, limit: int) -> dict:
+        """
+        One page of stored chunks, with their embeddings, for export:
+        {"ids": [...], "documents": [...], "metadatas": [...], "embeddings": array}.
+        """
+        snapshot = self._snapshot
+        ids = snapshot.ids[offset : offset + limit]
+        docs = [self.lexical_index.docs[id_] for id_ in ids]
+        return {
+            "ids": ids,
+            "documents": [doc["document"] for doc in docs],
+            "metadatas": [doc["metadata"] for doc in docs],
+            "embeddings": np.asarray(snapshot.matrix[offset : offset + limit]),
+        }
@@ -0,0 +1,128 @@
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable
+
+from loguru import logger
+
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+QUERY_BATCH_WINDOW_MS = float(os.getenv("QUERY_BATCH_WINDOW_MS", "3"))
+QUERY_MAX_BATCH_SIZE = int(os.getenv("QUERY_MAX_BATCH_SIZE", "32"))
+
+
+def normalize_question(question: str) -> str:
+    # MiniLM's tokenizer is uncased and ignores whitespace runs,
+    # so this does not change the embedding
+    return " ".join(question.lower().split())
+
+
+class QueryEncoder:
+    """
+    Embeds single questions through an exact-match LRU cache and a
+    micro-batcher: questions arriving within `window_ms` of each other
+    are encoded together in one forward pass.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[list[str]], "list | object"],
+        cache_size: int = QUERY_CACHE_SIZE,
+        window_ms: float = QUERY_BATCH_WINDOW_MS,
+        max_batch_size: int = QUERY_MAX_BATCH_SIZE,
+    ):
+        self._encode_fn = encode_fn
+        self.cache_size = cache_size
+        self.window_s = window_ms / 1000
+        self.max_batch_size = max_batch_size
+
+        self._cache: OrderedDict[str, list[float]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._worker = None
+
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+        self.batched_queries = 0
+
+    def encode(self, question: str) -> list[float]:
+        key = normalize_question(question)
+
+        with self._lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return embedding
+
+            self.misses += 1
+            future = self._inflight.get(key)
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+                self._queue.put((key, future))
+                self._ensure_worker()
+
+        return future.result()
+
+    def _ensure_worker(self):
+        if self._worker is None:
+            self._worker = threading.Thread(
+                target=self._run, name="query-encoder", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window_s
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: list[tuple[str, Future]]):
+        keys = [key for key, _ in batch]
+        try:
+            embeddings = self._encode_fn(keys)
+        except Exception as e:
+            logger.error(f"Query embedding failed: {e}")
+            with self._lock:
+                for key, future in batch:
+                    self._inflight.pop(key, None)
+                    future.set_exception(e)
+            return
+
+        with self._lock:
+            self.batches += 1
+            self.batched_queries += len(batch)
+            for (key, future), embedding in zip(batch, embeddings):
+                embedding = list(map(float, embedding))
+                self._cache[key] = embedding
+                self._inflight.pop(key, None)
+                future.set_result(embedding)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._cache),
+                "batches": self.batches,
+                "avg_batch_size": (
+                    self.batched_queries / self.batches if self.batches else 0.0
+                ),
+            }
@@ -0,0 +1,124 @@
+import os
+import queue
+import threading
+from multiprocessing.connection import Client, Connection
+from typing import Optional
+
+from loguru import logger
+
+
+# Unix socket of the vector store server (python -m src.vector_store.server).
+# When set, API workers use it instead of loading the model themselves.
+VECTOR_STORE_SOCKET = os.getenv("VECTOR_STORE_SOCKET", "")
+# Shared secret of the socket (requests are pickles, so whoever holds it can
+# run code in the server). When unset, the server generates a random one at
+# startup and writes it to <socket>.key with mode 0600, and workers of the
+# same user read it from there
+VECTOR_STORE_AUTHKEY = os.getenv("VECTOR_STORE_AUTHKEY", "")
+
+# Vector store methods served over the socket
+EXPOSED_METHODS = frozenset(
+    {
+        "warm_up",
+        "warm_up_reranker",
+        "embed",
+        "embed_query",
+        "get_top_chunks",
+        "get_top_chunks_batch",
+        "add",
+        "upsert",
+        "delete",
+        "update_metadata",
+        "get_source_metadata",
+        "list_departments",
+        "rerank_stats",
+        "embedding_model_id",
+        "count",
+        "get_chunks",
+        "save",
+    }
+)
+
+
+class RemoteVectorStoreError(Exception):
+    """The server raised an exception that could not be sent back as is."""
+
+
+def authkey_path(socket_path: str) -> str:
+    return f"{socket_path}.key"
+
+
+def read_authkey(socket_path: str) -> bytes:
+    if VECTOR_STORE_AUTHKEY:
+        return VECTOR_STORE_AUTHKEY.encode()
+    try:
+        with open(authkey_path(socket_path), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        raise RemoteVectorStoreError(
+            f"VECTOR_STORE_AUTHKEY is unset and {authkey_path(socket_path)} does not "
+            "exist; start the vector store server first"
+        ) from None
+
+
+class RemoteVectorStore:
+    """
+    Vector store interface backed by the vector store server.
+
+    Every call is one request/response on a Unix socket connection.
+    Connections are not thread-safe, so each call borrows one from a pool
+    and returns it afterwards; the pool grows to the number of threads
+    calling at once.
+    """
+
+    _instance: Optional["RemoteVectorStore"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, socket_path: str = VECTOR_STORE_SOCKET):
+        self.socket_path = socket_path
+        self._idle: queue.LifoQueue[Connection] = queue.LifoQueue()
+
+    @classmethod
+    def get_instance(cls):
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    logger.info(f"Using vector store server at {VECTOR_STORE_SOCKET}")
+                    cls._instance = cls()
+        return cls._instance
+
+    def _connect(self) -> Connection:
+        # read per connection: a restarted server has a new generated key
+        return Client(self.socket_path, family="AF_UNIX", authkey=read_authkey(self.socket_path))
+
+    def _call(self, name: str, *args, **kwargs):
+        try:
+            conn, pooled = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, pooled = self._connect(), False
+
+        try:
+            conn.send((name, args, kwargs))
+            ok, result = conn.recv()
+        except (EOFError, OSError):
+            conn.close()
+            if not pooled:
+                raise
+            # the server closed an idle connection (e.g. it restarted); retry fresh
+            conn = self._connect()
+            conn.send((name, args, kwargs))
+            ok, result = conn.recv()
+
+        self._idle.put(conn)
+        if not ok:
+            raise result
+        return result
+
+    @property
+    def version(self) -> int:
+        return self._call("version")
+
+    def __getattr__(self, name: str):
+        if name not in EXPOSED_METHODS:
+            raise AttributeError(name)
+        return lambda *args, **kwargs: self._call(name, *args, **kwargs)
@@ -0,0 +1,171 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from loguru import logger
+
+from src.vector_store.query_encoder import normalize_question
+
+
+# Re-rank retrieved chunks with a cross-encoder unless a request says otherwise
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() == "true"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# Candidates retrieved per requested chunk, for the cross-encoder to choose from
+RERANK_CANDIDATES_PER_K = int(os.getenv("RERANK_CANDIDATES_PER_K", "4"))
+# Past this, the request keeps the retriever's order
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "250"))
+# Drop candidates scoring below this (ms-marco logits; unset keeps top_k)
+RERANK_MIN_SCORE = (
+    float(os.environ["RERANK_MIN_SCORE"]) if os.getenv("RERANK_MIN_SCORE") else None
+)
+RERANK_CACHE_SIZE = int(os.getenv("RERANK_CACHE_SIZE", "4096"))
+
+
+class Reranker:
+    """
+    Scores (question, chunk) pairs with a small cross-encoder on CPU.
+
+    Scores are cached per (question, chunk id, chunk text), so only new
+    pairs are scored, in one batch per call (for all of its questions).
+    Scoring runs on a single background thread; a call waits at most
+    `budget_ms` for it and otherwise keeps the retriever's order. The model
+    load on first use is not part of the budget: warm_up() does it at
+    startup, or the first call waits for it. A batch that started late
+    still lands in the cache for the next time.
+    """
+
+    def __init__(
+        self,
+        model_name: str = RERANK_MODEL,
+        budget_ms: float = RERANK_BUDGET_MS,
+        cache_size: int = RERANK_CACHE_SIZE,
+    ):
+        self.model_name = model_name
+        self.budget_s = budget_ms / 1000
+        self.cache_size = cache_size
+        self._model = None
+        self._cache: OrderedDict[tuple, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank")
+        self.reranked = 0
+        self.fallbacks = 0
+        self.pairs_scored = 0
+        self.pairs_cached = 0
+
+    def _load(self):
+        if self._model is None:
+            # import here to avoid startup cost
+            from sentence_transformers import CrossEncoder
+
+            logger.info(f"Loading cross-encoder {self.model_name}...")
+            self._model = CrossEncoder(self.model_name)
+        return self._model
+
+    def warm_up(self):
+        self._executor.submit(lambda: self._load().predict([("warm-up", "warm-up")])).result()
+
+    @staticmethod
+    def _key(question: str, chunk: dict) -> tuple:
+        return (question, chunk["id"], hash(chunk["document"]))
+
+    def _score(self, questions: list[str], chunk_lists: list[list[dict]]) -> list[list[float]]:
+        pairs = [
+            (question, chunk)
+            for question, chunks in zip(questions, chunk_lists)
+            for chunk in chunks
+        ]
+        keys = [self._key(question, chunk) for question, chunk in pairs]
+        with self._lock:
+            scores = [self._cache.get(key) for key in keys]
+        missing = [i for i, score in enumerate(scores) if score is None]
+
+        if missing:
+            predicted = self._load().predict(
+                [(pairs[i][0], pairs[i][1]["document"]) for i in missing]
+            )
+            with self._lock:
+                for i, score in zip(missing, predicted):
+                    scores[i] = float(score)
+                    self._cache[keys[i]] = scores[i]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                self.pairs_scored += len(missing)
+
+        with self._lock:
+            self.pairs_cached += len(pairs) - len(missing)
+
+        per_question, start = [], 0
+        for chunks in chunk_lists:
+            per_question.append(scores[start : start + len(chunks)])
+            start += len(chunks)
+        return per_question
+
+    def _fallback(self, chunk_lists: list[list[dict]], top_k: int) -> list[list[dict]]:
+        with self._lock:
+            self.fallbacks += len(chunk_lists)
+        return [chunks[:top_k] for chunks in chunk_lists]
+
+    def rerank(self, question: str, chunks: list[dict], top_k: int) -> list[dict]:
+        """
+        Returns the top_k of `chunks` by cross-encoder score (as "score",
+        higher is better), or the first top_k unchanged when scoring does
+        not finish within the budget.
+        """
+        return self.rerank_batch([question], [chunks], top_k)[0]
+
+    def rerank_batch(
+        self, questions: list[str], chunk_lists: list[list[dict]], top_k: int
+    ) -> list[list[dict]]:
+        """
+        rerank for several questions, scored together within one budget.
+        """
+        if not any(chunk_lists):
+            return chunk_lists
+
+        if self._model is None:
+            # the one-time load doesn't count against the budget
+            self._executor.submit(self._load).result()
+
+        future = self._executor.submit(
+            self._score, [normalize_question(q) for q in questions], chunk_lists
+        )
+        try:
+            scores = future.result(timeout=self.budget_s)
+        except FutureTimeoutError:
+            logger.warning(
+                f"Re-ranking exceeded {self.budget_s * 1000:.0f}ms, keeping retriever order"
+            )
+            # don't let queued batches pile up behind a slow one
+            future.cancel()
+            return self._fallback(chunk_lists, top_k)
+        except Exception as e:
+            logger.error(f"Re-ranking failed, keeping retriever order: {e}")
+            return self._fallback(chunk_lists, top_k)
+
+        with self._lock:
+            self.reranked += len(questions)
+
+        results = []
+        for chunks, chunk_scores in zip(chunk_lists, scores):
+            ranked = sorted(
+                ({**chunk, "score": score} for chunk, score in zip(chunks, chunk_scores)),
+                key=lambda c: c["score"],
+                reverse=True,
+            )
+            if RERANK_MIN_SCORE is not None:
+                # always keep the best chunk, so the prompt is never empty
+                ranked = ranked[:1] + [c for c in ranked[1:] if c["score"] >= RERANK_MIN_SCORE]
+            results.append(ranked[:top_k])
+        return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "reranked": self.reranked,
+                "fallbacks": self.fallbacks,
+                "pairs_scored": self.pairs_scored,
+                "pairs_cached": self.pairs_cached,
+                "entries": len(self._cache),
+            }
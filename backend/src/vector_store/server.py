@@ -0,0 +1,126 @@
+"""
+Vector store server: one process owns the embedding model, the vector
+store (Chroma or NumPy, see VECTOR_STORE_BACKEND) and the BM25 index, and serves them to API workers over a Unix socket, so
+N uvicorn workers share one copy of the model weights.
+
+Usage (from backend/):
+    python -m src.vector_store.server --socket /tmp/uet-vector-store.sock
+    VECTOR_STORE_SOCKET=/tmp/uet-vector-store.sock uvicorn src.main:app --workers 4
+"""
+
+import argparse
+import os
+import pickle
+import secrets
+import threading
+from multiprocessing.connection import Connection, Listener
+
+from loguru import logger
+
+from src.vector_store.base import BaseVectorStore
+from src.vector_store.factory import get_local_vector_store
+from src.vector_store.remote import (
+    EXPOSED_METHODS,
+    VECTOR_STORE_AUTHKEY,
+    VECTOR_STORE_SOCKET,
+    RemoteVectorStoreError,
+    authkey_path,
+)
+
+
+def _reply(conn: Connection, ok: bool, result):
+    try:
+        conn.send((ok, result))
+    except (pickle.PicklingError, TypeError, AttributeError):
+        conn.send((False, RemoteVectorStoreError(repr(result))))
+
+
+def _serve_connection(conn: Connection, store: BaseVectorStore):
+    """
+    Answers requests from one worker connection until it closes. Requests
+    from different connections run in parallel threads, so concurrent
+    query embeddings still reach the store's micro-batcher together.
+    """
+    with conn:
+        while True:
+            try:
+                name, args, kwargs = conn.recv()
+            except (EOFError, OSError):
+                return
+
+            if name == "version":
+                _reply(conn, True, store.version)
+                continue
+            if name not in EXPOSED_METHODS:
+                _reply(conn, False, AttributeError(name))
+                continue
+            try:
+                result = getattr(store, name)(*args, **kwargs)
+            except Exception as e:
+                logger.error(f"Vector store call {name} failed: {e}")
+                _reply(conn, False, e)
+                continue
+            _reply(conn, True, result)
+
+
+def _write_authkey(path: str) -> bytes:
+    """
+    Writes a new random key, readable by this user only. O_EXCL and
+    O_NOFOLLOW refuse a file or symlink someone else put there (e.g. in /tmp).
+    """
+    key = secrets.token_hex(32).encode()
+    if os.path.lexists(path):
+        os.unlink(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_NOFOLLOW, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+def serve(socket_path: str):
+    store = get_local_vector_store()
+    store.warm_up()
+
+    if VECTOR_STORE_AUTHKEY:
+        authkey = VECTOR_STORE_AUTHKEY.encode()
+    else:
+        authkey = _write_authkey(authkey_path(socket_path))
+        logger.info(f"Generated the vector store key in {authkey_path(socket_path)}")
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    # only processes of the same user may connect; the socket is created
+    # with these permissions, a chmod after bind would leave a window
+    umask = os.umask(0o077)
+    try:
+        listener = Listener(socket_path, family="AF_UNIX", authkey=authkey)
+    finally:
+        os.umask(umask)
+    logger.info(f"Vector store server listening on {socket_path}")
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # failed authentication or a client that went away mid-handshake
+                logger.warning(f"Rejected vector store connection: {e}")
+                continue
+            threading.Thread(
+                target=_serve_connection, args=(conn, store), daemon=True
+            ).start()
+    finally:
+        listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--socket", default=VECTOR_STORE_SOCKET or "/tmp/uet-vector-store.sock"
+    )
+    args = parser.parse_args()
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+POST /ask/batch keeps the history of questions answered before the
+client went away.
+
+Run from backend/:
+    python -m pytest -q tests
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+
+from sqlalchemy import delete, select  # noqa: E402
+
+from src.database.config import Base, SessionLocal, engine  # noqa: E402
+from src.database.models import ChatHistory  # noqa: E402
+from src.main import app  # noqa: E402
+from src.routers import ask_llama_api  # noqa: E402
+from src.services.answer_cache import SemanticAnswerCache  # noqa: E402
+from src.services.llm_service import FakeLLMBackend, LLMService  # noqa: E402
+
+
+class StubVectorStore:
+    version = 0
+
+    def embed(self, questions: list[str]) -> list[list[float]]:
+        return [[1.0, 0.0, float(i)] for i in range(len(questions))]
+
+    def get_top_chunks_batch(self, questions: list[str], top_k: int = 3, **kwargs):
+        return [
+            [{"id": f"stub_{i}", "document": f"stub chunk {i}", "score": 0.0}]
+            for i in range(len(questions))
+        ]
+
+
+async def _disconnect_after_first_answer(body: bytes, spec_version: str) -> list[dict]:
+    """
+    Runs the app on one request and disconnects once the first answer
+    line is sent; returns the lines received.
+    """
+    answered = asyncio.Event()
+    lines = []
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/ask/batch",
+        "raw_path": b"/ask/batch",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("test", 1),
+        "server": ("test", 80),
+    }
+    requested = disconnected = False
+
+    async def receive():
+        nonlocal requested, disconnected
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await answered.wait()
+        disconnected = True
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        # like uvicorn, drop what is sent after the disconnect
+        if message["type"] != "http.response.body" or disconnected:
+            return
+        for line in message.get("body", b"").decode().splitlines():
+            lines.append(json.loads(line))
+            if "index" in lines[-1]:
+                answered.set()
+
+    await app(scope, receive, send)
+    return lines
+
+
+def test_batch_disconnect_keeps_answered_history(monkeypatch):
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(ask_llama_api, "get_vector_store", lambda: StubVectorStore())
+    # one answer at a time, so the client leaves with the rest unanswered
+    monkeypatch.setattr(ask_llama_api, "ASK_BATCH_CONCURRENCY", 1)
+    monkeypatch.setattr(
+        LLMService, "_instance", LLMService(backend=FakeLLMBackend(latency_ms=50), slots=1)
+    )
+    monkeypatch.setattr(SemanticAnswerCache, "_instance", SemanticAnswerCache(threshold=2.0))
+
+    questions = [f"question {i}" for i in range(4)]
+    body = json.dumps({"questions": questions}).encode()
+
+    for spec_version in ("2.3", "2.4"):
+        with SessionLocal() as db:
+            db.execute(delete(ChatHistory))
+            db.commit()
+
+        lines = asyncio.run(_disconnect_after_first_answer(body, spec_version))
+
+        answered = [line for line in lines if line.get("success")]
+        assert answered, spec_version
+        with SessionLocal() as db:
+            stored = db.scalars(select(ChatHistory.question)).all()
+        assert len(stored) >= len(answered), spec_version
+        assert {line["question"] for line in answered} <= set(stored), spec_version